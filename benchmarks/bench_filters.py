@@ -0,0 +1,71 @@
+import re
+import time
+import random
+import argparse
+
+import pandas as pd
+
+from call4papers.filters import compile_matcher
+
+WORDS = ["international", "conference", "workshop", "symposium", "learning", "neural", "language", "vision",
+         "computational", "linguistics", "machine", "translation", "systems", "data", "intelligence", "robotics",
+         "information", "retrieval", "networks", "security", "software", "engineering", "graphics", "databases"]
+
+
+def make_data(n_rows, n_keywords, n_acronyms, seed=0):
+    # Titles and acronyms of the conferences, keyword phrases (many share a prefix) and acronym lists
+    rnd = random.Random(seed)
+    titles = pd.Series([" ".join(rnd.sample(WORDS, 6)) for _ in range(n_rows)])
+    acronyms = pd.Series([f"c{i:05d}" for i in range(n_rows)])
+    keywords = set()
+    while len(keywords) < n_keywords:
+        keywords.add(" ".join(rnd.sample(WORDS, 3)) + rnd.choice(["", "s", " for", " and"]))
+    whitelist = {f"c{rnd.randrange(n_rows * 2):05d}" for _ in range(n_acronyms)}
+    return titles, acronyms, frozenset(keywords), frozenset(whitelist)
+
+
+def compile_alternation(words, word_boundary=False):
+    # Previous path: one alternative per word, tried one after the other at each position
+    regex = "|".join(re.escape(w.lower()) for w in sorted(words))
+    if word_boundary:
+        regex = f"\\b(?:{regex})\\b"
+    return re.compile(regex)
+
+
+def measure(series, matcher, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        mask = series.str.contains(matcher, regex=True)
+    return mask, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the keyword matchers (trie regex vs plain alternation)')
+    parser.add_argument('--rows', type=int, default=5000, help='Number of conferences')
+    parser.add_argument('--keywords', type=int, default=500, help='Number of keywords')
+    parser.add_argument('--acronyms', type=int, default=500, help='Number of acronyms of the whitelist')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per matcher')
+    args = parser.parse_args()
+
+    titles, acronyms, keywords, whitelist = make_data(args.rows, args.keywords, args.acronyms)
+    cases = [("Keywords", titles, keywords, False), ("Whitelist", acronyms, whitelist, True)]
+    for name, series, words, word_boundary in cases:
+        start = time.perf_counter()
+        alternation = compile_alternation(words, word_boundary=word_boundary)
+        alternation_compile = time.perf_counter() - start
+        start = time.perf_counter()
+        trie = compile_matcher.__wrapped__(words, word_boundary=word_boundary)  # Not the lru_cache
+        trie_compile = time.perf_counter() - start
+
+        alternation_mask, alternation_time = measure(series, alternation, args.repeat)
+        trie_mask, trie_time = measure(series, trie, args.repeat)
+        same = alternation_mask.equals(trie_mask)
+        print(f"{name}: {len(words)} words, {len(series)} rows => {int(trie_mask.sum())} matches "
+              f"({'same' if same else 'DIFFERENT'} mask)")
+        print(f"\tAlternation: {alternation_time:.3f}s (compiled in {alternation_compile:.3f}s)")
+        print(f"\tTrie:        {trie_time:.3f}s (compiled in {trie_compile:.3f}s)")
+        print(f"\tSpeed-up: x{alternation_time / trie_time:.1f}")
+
+
+if __name__ == '__main__':
+    main()
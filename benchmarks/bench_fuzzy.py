@@ -0,0 +1,87 @@
+import time
+import random
+import argparse
+
+import pandas as pd
+from rapidfuzz import process
+
+from call4papers.matching import match_candidates, MATCH_THRESHOLD
+
+WORDS = ["international", "conference", "workshop", "symposium", "learning", "neural", "language", "vision",
+         "computational", "linguistics", "machine", "translation", "systems", "data", "intelligence", "robotics"]
+
+
+def make_candidates(n_conferences, n_events, seed=0):
+    # n_events candidate events (two rows each, as in WikiCFP) per conference and year
+    random.seed(seed)
+    conferences, tables = [], []
+    for i in range(n_conferences):
+        title = " ".join(random.sample(WORDS, 6))
+        rows = []
+        for yr in [2025, 2026]:
+            for _ in range(n_events):
+                event_title = " ".join(random.sample(WORDS, 6))
+                rows.append({"Event": f"C{i} {yr}", "When": event_title, "Where": "-", "Deadline": "-"})
+                rows.append({"Event": f"C{i} {yr}", "When": f"Jun 1, {yr}", "Where": "Somewhere", "Deadline": f"Mar 1, {yr}"})
+        conferences.append((title, f"C{i}"))
+        tables.append(pd.DataFrame(rows))
+    return conferences, tables
+
+
+def legacy_fuzzy_matching(df, title, threshold=MATCH_THRESHOLD):
+    # Previous path: one extract per conference and year, then re-scan the rows to find the winner
+    if len(df) >= 2:
+        ratios = process.extract(title, list(df["When"]))
+        best_title, best_score = ratios[0][:2]
+        if best_score >= threshold:
+            for i, (_, row) in enumerate(df.iterrows()):
+                if row["When"] == best_title:
+                    return df[i:i+2], best_score
+    return None, 0.0
+
+
+def run_legacy(conferences, tables, threshold=MATCH_THRESHOLD):
+    matches = 0
+    for (title, acronym), df in zip(conferences, tables):
+        for yr in [2025, 2026]:
+            df_yr = df.loc[df['Event'] == f"{acronym} {yr}"]
+            df_yr, _ = legacy_fuzzy_matching(df_yr, title, threshold=threshold)
+            matches += int(df_yr is not None)
+    return matches
+
+
+def run_batched(conferences, tables, threshold=MATCH_THRESHOLD):
+    candidates = []
+    for key, ((title, acronym), df) in enumerate(zip(conferences, tables)):
+        for j, (event, when) in enumerate(zip(df["Event"], df["When"])):
+            if j % 2 == 0:  # Title rows
+                candidates.append({"key": key, "year": int(event.split()[-1]), "event": j, "query": title, "choice": when})
+    candidates = pd.DataFrame(candidates)
+    return len(match_candidates(candidates, threshold=threshold)), len(candidates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the WikiCFP fuzzy matching')
+    parser.add_argument('--conferences', type=int, default=500, help='Number of conferences')
+    parser.add_argument('--events', type=int, default=3, help='Candidate events per conference and year')
+    parser.add_argument('--threshold', type=float, default=MATCH_THRESHOLD, help='Minimum score (0-100)')
+    args = parser.parse_args()
+
+    conferences, tables = make_candidates(args.conferences, args.events)
+
+    start = time.perf_counter()
+    legacy_matches = run_legacy(conferences, tables, threshold=args.threshold)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched_matches, n_candidates = run_batched(conferences, tables, threshold=args.threshold)
+    batched_time = time.perf_counter() - start
+
+    print(f"Candidates: {n_candidates} ({args.conferences} conferences)")
+    print(f"Legacy:  {legacy_time:.3f}s ({legacy_matches} matches)")
+    print(f"Batched: {batched_time:.3f}s ({batched_matches} matches)")
+    print(f"Speed-up: x{legacy_time / batched_time:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import io
+import os
+import time
+import tempfile
+import argparse
+import contextlib
+
+import requests
+
+from replay_server import ReplayServer, make_fixtures
+from call4papers.constants import CORE_EDITIONS
+from call4papers.sources import get_core_url
+from call4papers.history import load_rank_history, get_history_columns, get_edition_year
+
+
+def download_sequential(editions, base_url, path):
+    # Previous path: one edition at a time, one CSV per edition
+    os.makedirs(path, exist_ok=True)
+    for edition in editions:
+        response = requests.get(get_core_url(edition, base_url))
+        with open(os.path.join(path, f"cache_{edition.lower()}.csv"), 'w') as f:
+            f.write(response.text)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the CORE rank history (sequential CSVs vs parallel store)')
+    parser.add_argument('--conferences', type=int, default=3000, help='Number of conferences')
+    parser.add_argument('--latency', type=float, default=0.5, help='Latency (in seconds) of each request')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent edition downloads')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    fixtures = make_fixtures(os.path.join(tmp_dir.name, "fixtures"), n_conferences=args.conferences,
+                             categories=[], editions=CORE_EDITIONS)
+    server = ReplayServer(fixtures, latency=args.latency)
+    server.start()
+    try:
+        start = time.perf_counter()
+        csv_size = download_sequential(CORE_EDITIONS, server.core_url, os.path.join(tmp_dir.name, "csv"))
+        sequential_time = time.perf_counter() - start
+
+        cache_dir = os.path.join(tmp_dir.name, "cache")
+        os.makedirs(cache_dir)
+        times, requests_made = [], []
+        for _ in range(2):  # Cold (download) and warm (stored)
+            n_requests = server.requests
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                df_history = load_rank_history(CORE_EDITIONS, cache_dir=cache_dir, base_url=server.core_url,
+                                               concurrency=args.concurrency)
+            times.append(time.perf_counter() - start)
+            requests_made.append(server.requests - n_requests)
+    finally:
+        server.stop()
+
+    start = time.perf_counter()
+    columns = get_history_columns(df_history, sorted(CORE_EDITIONS, key=get_edition_year))
+    columns_time = time.perf_counter() - start
+
+    store_size = os.path.getsize(os.path.join(cache_dir, "core_history.sqlite"))
+    print(f"Editions: {len(CORE_EDITIONS)} ({len(df_history)} ranks, {len(columns)} acronyms)")
+    print(f"Sequential: {sequential_time:.3f}s, {csv_size / 1024:.0f} KB in {len(CORE_EDITIONS)} CSVs")
+    print(f"Parallel:   {times[0]:.3f}s, {store_size / 1024:.0f} KB store ({requests_made[0]} requests)")
+    print(f"Stored:     {times[1]:.3f}s ({requests_made[1]} requests)")
+    print(f"History columns: {columns_time:.3f}s ({', '.join(f'{k}: {v}' for k, v in columns['CORE trend'].value_counts().items())})")
+    print(f"Speed-up: x{sequential_time / times[0]:.1f} (download), x{sequential_time / times[1]:.1f} (stored)")
+    tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
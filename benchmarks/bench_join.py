@@ -0,0 +1,75 @@
+import time
+import random
+import argparse
+import datetime
+import tracemalloc
+
+import pandas as pd
+
+from call4papers.wikicfp import resolve_deadlines, join_deadlines, normalize_acronym
+
+WORDS = ["international", "conference", "workshop", "symposium", "learning", "neural", "language", "vision",
+         "computational", "linguistics", "machine", "translation", "systems", "data", "intelligence", "robotics"]
+
+
+def make_table(n_rows, n_columns=12, seed=0):
+    # Merged CORE/GGS rows (with the extra columns of both sources) and the WikiCFP events of each acronym
+    rnd = random.Random(seed)
+    year = datetime.datetime.now().year
+    rows, events = [], {}
+    for i in range(n_rows):
+        acronym, title = f"C{i:05d}", " ".join(rnd.sample(WORDS, 6))
+        rows.append({"Acronym": acronym, "Title": title, **{f"extra {j}": f"value {j} {i}" for j in range(n_columns)}})
+        events[normalize_acronym(acronym)] = [
+            {"event": f"{acronym} {yr}", "title": title if k == 0 else " ".join(rnd.sample(WORDS, 6)),
+             "when": f"Jun 1, {yr} - Jun 5, {yr}", "where": "Somewhere", "deadline": f"Mar 1, {yr}"}
+            for yr in [year, year + 1] for k in range(2)]
+    return pd.DataFrame(rows), events
+
+
+def legacy_join_deadlines(df, events):
+    # Previous path: a Series per row, one dict rebuild per row and result
+    rows = [row for _, row in df.iterrows()]
+    conferences = [(row["Title"], row["Acronym"]) for row in rows]
+    results = resolve_deadlines(conferences, [events.get(normalize_acronym(row["Acronym"]), []) for row in rows],
+                                verbose=False)
+    new_rows = []
+    for row, r in zip(rows, results):
+        if len(r) == 0:
+            new_rows.append(dict(row))
+        for values in r:
+            new_rows.append(dict(list(dict(row).items()) + list(values.items())))
+    return pd.DataFrame(new_rows)
+
+
+def measure(func, *args, **kwargs):
+    # Wall time is measured with tracemalloc on (slower than a normal run, for both paths)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the join of the WikiCFP deadlines (rows vs keys)')
+    parser.add_argument('--rows', type=int, default=10000, help='Number of conferences')
+    parser.add_argument('--columns', type=int, default=12, help='Extra columns per row')
+    args = parser.parse_args()
+
+    df, events = make_table(args.rows, n_columns=args.columns)
+
+    legacy, legacy_time, legacy_peak = measure(legacy_join_deadlines, df, events)
+    keyed, keyed_time, keyed_peak = measure(join_deadlines, df, events, verbose=False)
+
+    same = legacy[keyed.columns].equals(keyed)
+    print(f"Rows: {len(df)} => {len(keyed)} ({'same' if same else 'DIFFERENT'} output)")
+    print(f"Legacy: {legacy_time:.3f}s, peak {legacy_peak / 1024 ** 2:.1f} MB")
+    print(f"Keys:   {keyed_time:.3f}s, peak {keyed_peak / 1024 ** 2:.1f} MB")
+    print(f"Speed-up: x{legacy_time / keyed_time:.1f}, memory: x{legacy_peak / keyed_peak:.1f}")
+
+
+if __name__ == '__main__':
+    main()
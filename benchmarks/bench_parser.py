@@ -0,0 +1,84 @@
+import os
+import glob
+import time
+import tempfile
+import argparse
+from io import StringIO
+
+import pandas as pd
+
+from replay_server import make_fixtures
+
+from call4papers.wikicfp import parse_events
+
+
+def legacy_parse_events(html):
+    # Previous path: pd.read_html builds a DataFrame for every table of the page
+    events = []
+    try:
+        tables = pd.read_html(StringIO(html))
+    except ValueError:  # No tables found
+        tables = []
+
+    df = None
+    for t_df in tables:
+        if len(t_df.shape) == 2 and t_df.shape[1] == 4:
+            df = t_df
+            break
+
+    if df is not None:
+        if set(df.iloc[0]) == {'Deadline', 'Event', 'Where', 'When'}:
+            new_header = df.iloc[0]
+            df = df[1:]
+            df.columns = new_header
+
+        if set(df.columns) == {'Deadline', 'Event', 'Where', 'When'}:
+            values = df[['Event', 'When', 'Where', 'Deadline']].values.tolist()
+            i = 0
+            while i < len(values) - 1:
+                if values[i][0] == values[i+1][0]:
+                    event, title = values[i][0], values[i][1]
+                    _, when, where, deadline = values[i+1]
+                    events.append({"event": event, "title": title, "when": when, "where": where, "deadline": deadline})
+                    i += 2
+                else:
+                    i += 1
+    return events
+
+
+def run(parser, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [parser(html) for html in pages]
+    return (time.perf_counter() - start) / (repeat * len(pages)), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the WikiCFP result parser')
+    parser.add_argument('--fixtures', type=str, default=None, help='Fixtures folder (default: synthetic fixtures)')
+    parser.add_argument('--pages', type=int, default=200, help='Number of synthetic pages')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures_dir = args.fixtures or make_fixtures(tmp_dir, n_conferences=args.pages)
+        pages = []
+        for filename in sorted(glob.glob(os.path.join(fixtures_dir, "wikicfp", "*.html"))):
+            with open(filename, 'r') as f:
+                pages.append(f.read())
+
+    legacy_time, legacy_events = run(legacy_parse_events, pages, args.repeat)
+    lxml_time, lxml_events = run(parse_events, pages, args.repeat)
+
+    # Both parsers must find the same events
+    same = sum(len(a) == len(b) and all(x["event"] == y["event"] and x["deadline"] == y["deadline"]
+                                        for x, y in zip(a, b)) for a, b in zip(legacy_events, lxml_events))
+
+    print(f"Pages: {len(pages)} ({sum(len(e) for e in lxml_events)} events, {same} pages with the same events)")
+    print(f"pd.read_html: {legacy_time * 1000:.2f} ms/page")
+    print(f"lxml:         {lxml_time * 1000:.2f} ms/page")
+    print(f"Speed-up: x{legacy_time / lxml_time:.1f}")
+
+
+if __name__ == '__main__':
+    main()
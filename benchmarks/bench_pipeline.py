@@ -0,0 +1,122 @@
+import io
+import os
+import json
+import time
+import tempfile
+import argparse
+import tracemalloc
+import contextlib
+
+from replay_server import ReplayServer, make_fixtures, CATEGORIES as BULK_CATEGORIES
+
+from call4papers.constants import DEFAULT_SETUPS
+from call4papers.main import search4papers, prettify_csv
+from call4papers.sources import load_core_conferences, load_ggs_conferences, merge_conferences, filter_invalid_rows
+from call4papers.filters import filter_conferences
+from call4papers.wikicfp import fetch_events, join_deadlines
+from call4papers.dates import normalize_deadlines
+
+
+class Benchmark:
+
+    def __init__(self, server, trace_memory=True, verbose=False):
+        self.server = server
+        self.trace_memory = trace_memory
+        self.verbose = verbose
+        self.report = []
+
+    def measure(self, name, func, *args, **kwargs):
+        requests, bytes_ = self.server.requests, self.server.bytes
+        if self.trace_memory:
+            tracemalloc.start()
+
+        # Hide the progress messages
+        output = None if self.verbose else io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+
+        peak = 0
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        self.report.append({"stage": name, "time": elapsed, "requests": self.server.requests - requests,
+                            "bytes": self.server.bytes - bytes_, "peak_memory": peak})
+        return result
+
+    def print_report(self):
+        print(f"{'Stage':<16} {'Time (s)':>10} {'Requests':>10} {'KB':>10} {'Peak MB':>10}")
+        for r in self.report:
+            print(f"{r['stage']:<16} {r['time']:>10.3f} {r['requests']:>10} {r['bytes'] / 1024:>10.1f} "
+                  f"{r['peak_memory'] / 1024 ** 2:>10.1f}")
+
+
+def run_end_to_end(bench, name, setup, cache_dir, output_file, concurrency, categories=None, in_time=False):
+    bench.measure(name, search4papers, output_file=output_file, ignore_wikicfp=False, ignore_ggs=False,
+                  in_time=in_time, force_download=False, show_extra=False, ref_source="all", concurrency=concurrency,
+                  retries=5, core_url=bench.server.core_url, ggs_url=bench.server.ggs_url,
+                  wikicfp_url=bench.server.wikicfp_url, wikicfp_category_url=bench.server.wikicfp_category_url,
+                  categories=categories, cache_dir=cache_dir, **setup)
+
+
+def run_stages(bench, setup, cache_dir, concurrency):
+    # Raw files are already cached by the end-to-end run; snapshots are not
+    for filename in os.listdir(cache_dir):
+        if filename.endswith(".snapshot.pkl"):
+            os.remove(os.path.join(cache_dir, filename))
+
+    df_core = bench.measure("load (CORE)", load_core_conferences, force_download=False, cache_dir=cache_dir)
+    df_ggs = bench.measure("load (GGS)", load_ggs_conferences, force_download=False, cache_dir=cache_dir)
+    df = bench.measure("merge", merge_conferences, df_core, df_ggs, ref_source="all")
+    df = bench.measure("filter", lambda x: filter_conferences(filter_invalid_rows(x), **setup), df)
+    events = bench.measure("enrich (fetch)", fetch_events, df["Acronym"], concurrency=concurrency, retries=5,
+                           backoff=0.01, base_url=bench.server.wikicfp_url)
+    df = bench.measure("enrich (join)", lambda: normalize_deadlines(join_deadlines(df, events)))
+    df["Acceptance Rate"] = None
+    bench.measure("prettify", prettify_csv, df, show_extra=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark of the call4papers pipeline')
+    parser.add_argument('--fixtures', type=str, default=None, help='Fixtures folder (default: synthetic fixtures)')
+    parser.add_argument('--conferences', type=int, default=1000, help='Number of synthetic conferences')
+    parser.add_argument('--setup', type=str, default="all", choices=list(DEFAULT_SETUPS.keys()), help='Filter setup')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latency (in seconds) of each request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Ratio of failed WikiCFP requests')
+    parser.add_argument('--concurrency', type=int, default=16, help='Maximum number of concurrent WikiCFP requests')
+    parser.add_argument('--bulk', action='store_true', help='Also run the bulk mode (WikiCFP call listings)')
+    parser.add_argument('--no-memory', action='store_true', help='Do not trace the peak memory (faster)')
+    parser.add_argument('--json', type=str, default=None, help='Save the report as JSON')
+    parser.add_argument('--verbose', action='store_true', help='Show the pipeline messages')
+    args = parser.parse_args()
+
+    setup = {k: v for k, v in DEFAULT_SETUPS[args.setup].items()}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures_dir = args.fixtures or make_fixtures(os.path.join(tmp_dir, "fixtures"), n_conferences=args.conferences)
+        cache_dir = os.path.join(tmp_dir, "cache")
+        output_file = os.path.join(tmp_dir, "conferences.csv")
+
+        server = ReplayServer(fixtures_dir, latency=args.latency, error_rate=args.error_rate).start()
+        bench = Benchmark(server, trace_memory=not args.no_memory, verbose=args.verbose)
+        try:
+            run_end_to_end(bench, "end-to-end (cold)", setup, cache_dir, output_file, args.concurrency)
+            run_end_to_end(bench, "end-to-end (warm)", setup, cache_dir, output_file, args.concurrency)
+            run_stages(bench, setup, cache_dir, args.concurrency)
+            if args.bulk:  # Cold caches. The listings only have open calls: in-time runs
+                run_end_to_end(bench, "in time (cold)", setup, os.path.join(tmp_dir, "cache_in_time"), output_file,
+                               args.concurrency, in_time=True)
+                run_end_to_end(bench, "bulk (cold)", setup, os.path.join(tmp_dir, "cache_bulk"), output_file,
+                               args.concurrency, categories=BULK_CATEGORIES, in_time=True)
+        finally:
+            server.stop()
+
+    bench.print_report()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"args": vars(args), "stages": bench.report}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import time
+import random
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from call4papers.resolution import find_aliases, get_candidate_pairs, score_candidates, normalize_name
+
+WORDS = ["learning", "neural", "language", "vision", "computational", "linguistics", "machine", "translation",
+         "systems", "data", "intelligence", "robotics", "networks", "security", "databases", "graphics", "theory",
+         "software", "retrieval", "knowledge", "mining", "web", "distributed", "parallel", "embedded", "cloud",
+         "semantic", "information", "processing", "discovery", "multimedia", "signal", "speech", "agents"]
+PREFIXES = ["International Conference on", "Symposium on", "Workshop on", "European Conference on",
+            "Asian Conference on", "Annual Meeting on"]
+
+
+def make_sources(n_core, n_ggs, n_aliases, seed=0):
+    # Half of the smaller source is in both. n_aliases shared venues get another acronym in GGS ("LNV12" => "XNV12")
+    rnd = random.Random(seed)
+    venues = []
+    for i in range(n_core + n_ggs - min(n_core, n_ggs) // 2):
+        words = rnd.sample(WORDS, 3)
+        venues.append((f"{''.join(w[0] for w in words).upper()}{i}", f"{rnd.choice(PREFIXES)} {' '.join(words).title()}"))
+
+    df_core = pd.DataFrame(venues[:n_core], columns=["Acronym", "CORE_title"])
+    df_ggs = pd.DataFrame(venues[-n_ggs:], columns=["Acronym", "GGS_title"])
+    renamed = rnd.sample([i for i in df_ggs.index if df_ggs.loc[i, "Acronym"] in set(df_core["Acronym"])], n_aliases)
+    expected = set()
+    for i in renamed:
+        acronym = df_ggs.loc[i, "Acronym"]
+        df_ggs.loc[i, "Acronym"] = "X" + acronym[1:]
+        df_ggs.loc[i, "GGS_title"] = "The " + df_ggs.loc[i, "GGS_title"]
+        expected.add((acronym, "X" + acronym[1:]))
+    return df_core, df_ggs, expected
+
+
+def run_all_pairs(df_core, df_ggs):
+    # Cross join of the unmatched rows (quadratic)
+    df_core = df_core[~df_core["Acronym"].isin(set(df_ggs["Acronym"]))]
+    df_ggs = df_ggs[~df_ggs["Acronym"].isin(set(df_core["Acronym"]))]
+    pairs = pd.merge(df_core, df_ggs, how="cross", suffixes=("", "_ggs"))
+    pairs = pairs.rename(columns={"Acronym": "CORE_acronym", "Acronym_ggs": "GGS_acronym"})
+    pairs = pairs.assign(name_core=pairs["CORE_title"].map(normalize_name), name_ggs=pairs["GGS_title"].map(normalize_name))
+    return score_candidates(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the CORE <=> GGS entity resolution (blocking vs all pairs)')
+    parser.add_argument('--core', type=int, default=1000, help='Number of CORE conferences')
+    parser.add_argument('--ggs', type=int, default=2000, help='Number of GGS conferences')
+    parser.add_argument('--aliases', type=int, default=50, help='Venues with a different acronym in GGS')
+    parser.add_argument('--threshold', type=float, default=85, help='Merge threshold (0-100)')
+    args = parser.parse_args()
+
+    df_core, df_ggs, expected = make_sources(args.core, args.ggs, args.aliases)
+
+    start = time.perf_counter()
+    n_pairs = len(get_candidate_pairs(df_core[~df_core["Acronym"].isin(set(df_ggs["Acronym"]))],
+                                      df_ggs[~df_ggs["Acronym"].isin(set(df_core["Acronym"]))]))
+    aliases = find_aliases(df_core, df_ggs, threshold=args.threshold)
+    blocked_time = time.perf_counter() - start
+    merged = aliases[aliases["status"] == "auto"]
+    found = set(zip(merged["CORE_acronym"], merged["GGS_acronym"]))
+
+    start = time.perf_counter()
+    all_pairs = run_all_pairs(df_core, df_ggs)
+    all_pairs_time = time.perf_counter() - start
+    best = np.sum(all_pairs["score"] >= args.threshold)
+
+    print(f"Unmatched: {(~df_core['Acronym'].isin(set(df_ggs['Acronym']))).sum()} CORE x "
+          f"{(~df_ggs['Acronym'].isin(set(df_core['Acronym']))).sum()} GGS")
+    print(f"Blocking:  {blocked_time:.3f}s ({n_pairs} pairs, {len(found)} merged, "
+          f"{len(found & expected)}/{len(expected)} expected, {(aliases['status'] == 'review').sum()} to review)")
+    print(f"All pairs: {all_pairs_time:.3f}s ({len(all_pairs)} pairs, {best} above the threshold)")
+    print(f"Speed-up: x{all_pairs_time / blocked_time:.1f}")
+
+
+if __name__ == '__main__':
+    main()
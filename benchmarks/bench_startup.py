@@ -0,0 +1,101 @@
+import io
+import os
+import sys
+import time
+import tempfile
+import argparse
+import contextlib
+import subprocess
+
+from replay_server import ReplayServer, make_fixtures
+
+# Commands that must start fast (no pandas, bs4,...)
+COMMANDS = {
+    "import": ["-c", "import call4papers.main"],
+    "--help": ["-m", "call4papers.main", "--help"],
+}
+FORBIDDEN = ["pandas", "bs4"]
+
+
+def parse_importtime(stderr):
+    # "import time: self [us] | cumulative | imported package" (nested imports are indented)
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+        if not name[1:].startswith(" "):  # Top-level import
+            total += int(cumulative)
+    return total, modules
+
+
+def prepare_cached_query(tmp_dir):
+    # Run the query once (offline, against the replay server), so the CLI finds it in the result cache
+    from call4papers.main import search4papers
+    from call4papers.constants import DEFAULT_SETUPS
+
+    cache_dir = os.path.join(tmp_dir, "cache")
+    output_file = os.path.join(tmp_dir, "conferences.csv")
+    server = ReplayServer(make_fixtures(os.path.join(tmp_dir, "fixtures"), n_conferences=200))
+    server.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            search4papers(output_file=output_file, ignore_wikicfp=False, ignore_ggs=False, in_time=False,
+                          force_download=False, show_extra=False, ref_source="all", core_url=server.core_url,
+                          ggs_url=server.ggs_url, wikicfp_url=server.wikicfp_url, cache_dir=cache_dir,
+                          result_cache_size=2**27, **DEFAULT_SETUPS["nlp"])
+    finally:
+        server.stop()
+    return ["-m", "call4papers.main", "--setup", "nlp", "--output-file", output_file, "--cache-dir", cache_dir]
+
+
+def run(args, repeat):
+    # Wall time (best of N) and import times
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    output = subprocess.run([sys.executable, "-X", "importtime"] + args, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True, check=True)
+    total, modules = parse_importtime(output.stderr)
+    return best, total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the startup time of the CLI (python -X importtime)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions (best wall time)')
+    parser.add_argument('--budget', type=float, default=300, help='Maximum wall time (in ms) for each command')
+    parser.add_argument('--top', type=int, default=5, help='Show the N slowest imports of each command')
+    args = parser.parse_args()
+
+    baseline, _, _ = run(["-c", "pass"], args.repeat)
+    print(f"Python startup: {baseline * 1000:.0f} ms")
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    commands = dict(COMMANDS, **{"cached query": prepare_cached_query(tmp_dir.name)})
+
+    failed = False
+    for name, command in commands.items():
+        wall, total, modules = run(command, args.repeat)
+        forbidden = [m for m in FORBIDDEN if m in modules]
+        ok = wall * 1000 <= args.budget and not forbidden
+        failed = failed or not ok
+
+        print(f"{name}: {wall * 1000:.0f} ms wall, {total / 1000:.0f} ms importing {len(modules)} modules "
+              f"[{'OK' if ok else 'FAIL'}]")
+        if forbidden:
+            print(f"\t=>[ERROR]: Imports {', '.join(forbidden)}")
+        for module, cumulative in sorted(modules.items(), key=lambda x: -x[1])[:args.top]:
+            print(f"\t{cumulative / 1000:8.1f} ms  {module}")
+
+    tmp_dir.cleanup()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
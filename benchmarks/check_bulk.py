@@ -0,0 +1,64 @@
+import io
+import os
+import sys
+import tempfile
+import argparse
+import contextlib
+
+from replay_server import ReplayServer, make_fixtures
+from call4papers.index import ConferenceIndex
+from call4papers.main import search4papers
+from call4papers.constants import DEFAULT_SETUPS
+
+CATEGORIES = ["artificial intelligence", "machine learning"]
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def main():
+    # Bulk mode regressions: the listings only have open calls, so their events must not leak into the queries
+    # that show past deadlines (same index, or the state of the next incremental refresh)
+    parser = argparse.ArgumentParser(description='Check that bulk mode gives the same rows as one search per acronym')
+    parser.add_argument('--conferences', type=int, default=200, help='Number of conferences')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    server = ReplayServer(make_fixtures(os.path.join(tmp_dir.name, "fixtures"), n_conferences=args.conferences,
+                                        categories=CATEGORIES))
+    server.start()
+    urls = dict(core_url=server.core_url, ggs_url=server.ggs_url, wikicfp_url=server.wikicfp_url)
+    setup = DEFAULT_SETUPS["nlp"]
+    results = {}
+    try:
+        # Query A (in time) then query B (all deadlines) on one index, vs a fresh index
+        reference = quiet(ConferenceIndex, cache_dir=os.path.join(tmp_dir.name, "reference"), **urls)
+        bulk = quiet(ConferenceIndex, cache_dir=os.path.join(tmp_dir.name, "bulk"), categories=CATEGORIES,
+                     wikicfp_category_url=server.wikicfp_category_url, **urls)
+        for in_time in [True, False]:
+            results[f"index in_time={in_time}"] = (len(quiet(bulk.query, in_time=in_time, **setup)),
+                                                   len(quiet(reference.query, in_time=in_time, **setup)))
+
+        # Incremental refresh after a bulk in-time run
+        run_args = dict(ignore_wikicfp=False, ignore_ggs=False, force_download=False, show_extra=False,
+                        ref_source="all", categories=CATEGORIES, wikicfp_category_url=server.wikicfp_category_url,
+                        **urls, **setup)
+        cache_dir, output_file = os.path.join(tmp_dir.name, "incremental"), os.path.join(tmp_dir.name, "out.csv")
+        quiet(search4papers, output_file, in_time=True, cache_dir=cache_dir, refresh="incremental", **run_args)
+        df = quiet(search4papers, output_file, in_time=False, cache_dir=cache_dir, refresh="incremental", **run_args)
+        results["incremental in_time=False"] = (len(df), results["index in_time=False"][1])
+    finally:
+        server.stop()
+        tmp_dir.cleanup()
+
+    failed = False
+    for name, (rows, expected) in results.items():
+        failed = failed or rows != expected
+        print(f"{name}: {rows} rows (expected {expected}) [{'OK' if rows == expected else 'FAIL'}]")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+import os
+import time
+import random
+import hashlib
+import datetime
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pandas as pd
+
+# Fixture layout (recorded or synthetic):
+#   core.csv                CORE export (without header)
+#   core_<EDITION>.csv      CORE export of a past edition (rank history)
+#   ggs_index.html          GGS index page, linking to ggs.xlsx
+#   ggs.xlsx                GGS conferences
+#   wikicfp/<ACRONYM>.html  WikiCFP search pages (missing acronyms get an empty result page)
+#   wikicfp_call/<CATEGORY>/<PAGE>.html  WikiCFP call listings (bulk mode)
+
+WORDS = ["international", "conference", "workshop", "symposium", "learning", "neural", "language", "vision",
+         "computational", "linguistics", "machine", "translation", "systems", "data", "intelligence", "robotics",
+         "networks", "security", "databases", "graphics", "theory", "software", "retrieval", "knowledge"]
+CORE_RANKS = ["A*", "A", "B", "C", "Australasian B", "Unranked"]
+GGS_CLASSES = ["1", "2", "3", "Work in progress"]
+CATEGORIES = ["artificial intelligence", "machine learning"]
+
+GGS_INDEX = """<html><body><div id="text"><div class="entry">
+<table><tbody><tr><td>GGS Conference Rating</td><td><a href="/ggs.xlsx">Download</a></td></tr></tbody></table>
+</div></div></body></html>"""
+
+WIKICFP_PAGE = """<html><body><table><tr><td>menu</td></tr></table>
+<table><tr><td>Event</td><td>When</td><td>Where</td><td>Deadline</td></tr>{rows}</table></body></html>"""
+WIKICFP_PAGER = """<a href="/cfp/call?conference={category}&page={page}">{page}</a>"""
+WIKICFP_EVENT = """<tr><td rowspan="2"><a href="#">{event}</a></td><td colspan="3">{title}</td></tr>
+<tr><td>{when}</td><td>{where}</td><td>{deadline}</td></tr>"""
+
+
+def make_fixtures(path, n_conferences=1000, seed=0, categories=CATEGORIES,
+                  listed=0.9, page_size=20, editions=()):
+    # Synthetic fixtures with the same structure as the live sources
+    rnd = random.Random(seed)
+    year = datetime.datetime.now().year
+    os.makedirs(os.path.join(path, "wikicfp"), exist_ok=True)
+
+    conferences = []
+    for i in range(n_conferences):
+        title = "International Conference on " + " ".join(rnd.sample(WORDS, 3)).title()
+        conferences.append((f"C{i:04d}", title))
+
+    # CORE covers the first 2/3 and GGS the last 2/3 (overlapping in the middle)
+    ranks = {}
+    with open(os.path.join(path, "core.csv"), 'w') as f:
+        for i, (acronym, title) in enumerate(conferences[:n_conferences * 2 // 3]):
+            ranks[acronym] = rnd.choice(CORE_RANKS)
+            f.write(f'{i},"{title}","{acronym}","CORE{year}","{ranks[acronym]}","Yes","Yes","4602","",""\n')
+    write_editions(path, conferences, ranks, editions, seed=seed)
+
+    rows = [[i, title, acronym, rnd.choice(GGS_CLASSES), "A+"]
+            for i, (acronym, title) in enumerate(conferences[n_conferences // 3:])]
+    with pd.ExcelWriter(os.path.join(path, "ggs.xlsx")) as writer:
+        pd.DataFrame([["GII-GRIN-SCIE (GGS) Conference Rating"]]).to_excel(writer, index=False, header=False)
+        pd.DataFrame(rows, columns=["#", "Title", "Acronym", "GGS Class", "GGS Rating"]).to_excel(writer, index=False, startrow=1)
+
+    with open(os.path.join(path, "ggs_index.html"), 'w') as f:
+        f.write(GGS_INDEX)
+
+    # Two editions per conference, each with a homonym workshop
+    calls = {category: [] for category in categories}
+    for acronym, title in conferences:
+        events, calls_open = [], []
+        for yr in [year, year + 1]:
+            month = rnd.randint(1, 12)
+            if datetime.date(yr, month, 1) >= datetime.date.today():
+                calls_open.append(len(events))
+            events.append(WIKICFP_EVENT.format(event=f"{acronym} {yr}", title=title, where="Valencia, Spain",
+                                               when=f"Sep {rnd.randint(1, 20)}, {yr} - Sep 25, {yr}",
+                                               deadline=f"{datetime.date(yr, month, 1):%b %d, %Y} ({datetime.date(yr, month, 1):%b %d, %Y})"))
+            events.append(WIKICFP_EVENT.format(event=f"{acronym} {yr}", title="Workshop on " + " ".join(rnd.sample(WORDS, 2)),
+                                               when="N/A", where="N/A", deadline="TBD"))
+        with open(os.path.join(path, "wikicfp", f"{acronym}.html"), 'w') as f:
+            f.write(WIKICFP_PAGE.format(rows="".join(events)))
+
+        # Open calls (deadline not passed) of most conferences are listed in one or two categories
+        if categories and rnd.random() < listed:
+            for category in rnd.sample(categories, rnd.randint(1, min(2, len(categories)))):
+                calls[category].extend(events[i] for i in calls_open)
+
+    for category, events in calls.items():
+        write_listing(path, category, events, page_size)
+    return path
+
+
+def write_editions(path, conferences, ranks, editions, seed=0):
+    # Past editions, newest first: each one moves some ranks one step from the next edition, and misses some venues
+    rnd = random.Random(seed + 1)
+    titles = dict(conferences)
+    for edition in sorted(editions, reverse=True):
+        ranks = {acronym: CORE_RANKS[min(max(CORE_RANKS.index(rank) + rnd.choice([-1, 1]), 0), 3)]
+                 if rank in CORE_RANKS[:4] and rnd.random() < 0.2 else rank
+                 for acronym, rank in ranks.items() if rnd.random() < 0.95}
+        with open(os.path.join(path, f"core_{edition}.csv"), 'w') as f:
+            for i, (acronym, rank) in enumerate(sorted(ranks.items())):
+                f.write(f'{i},"{titles[acronym]}","{acronym}","{edition}","{rank}","Yes","Yes","4602","",""\n')
+
+
+def write_listing(path, category, events, page_size=20):
+    dirname = os.path.join(path, "wikicfp_call", category.replace(" ", "_"))
+    os.makedirs(dirname, exist_ok=True)
+    n_pages = max((len(events) + page_size - 1) // page_size, 1)
+    pager = "".join(WIKICFP_PAGER.format(category=urllib.parse.quote(category), page=p) for p in range(1, n_pages + 1))
+    for page in range(1, n_pages + 1):
+        rows = "".join(events[(page - 1) * page_size:page * page_size])
+        with open(os.path.join(dirname, f"{page}.html"), 'w') as f:
+            f.write(WIKICFP_PAGE.format(rows=rows).replace("</body>", f"{pager}</body>"))
+
+
+class ReplayServer:
+    # Local stand-in for CORE, GGS and WikiCFP serving fixtures with configurable latency and error rate
+
+    def __init__(self, fixtures_dir, latency=0.0, error_rate=0.0, seed=0):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency  # Seconds per request
+        self.error_rate = error_rate  # Ratio of WikiCFP requests answered with a 503
+        self.requests = 0
+        self.not_modified = 0
+        self.etags = {}
+        self.bytes = 0
+        self.errors = 0
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def core_url(self):
+        return f"{self.url}/conf-ranks/"
+
+    @property
+    def ggs_url(self):
+        return f"{self.url}/"
+
+    @property
+    def wikicfp_url(self):
+        return f"{self.url}/cfp/servlet/tool.search"
+
+    @property
+    def wikicfp_category_url(self):
+        return f"{self.url}/cfp/call"
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, body, content_type = server.route(self.path, headers=self.headers)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if status in (200, 304) and content_type != "text/plain":
+                    self.send_header("ETag", server.get_etag(self.path))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def get_etag(self, path):
+        # Validator of the last response to this path (the files do not change while they are served)
+        with self._lock:
+            return self.etags.get(path, '""')
+
+    def route(self, path, headers=None):
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urllib.parse.urlparse(path)
+        if url.path.startswith("/conf-ranks/"):
+            edition = os.path.basename(urllib.parse.parse_qs(url.query).get("source", [""])[0])
+            filename, content_type = "core.csv", "text/csv"
+            if os.path.exists(os.path.join(self.fixtures_dir, f"core_{edition}.csv")):
+                filename = f"core_{edition}.csv"
+        elif url.path == "/ggs.xlsx":
+            filename, content_type = "ggs.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        elif url.path in ("/cfp/servlet/tool.search", "/cfp/call"):
+            with self._lock:
+                error = self._rnd.random() < self.error_rate
+            if error:
+                return self.count(503, b"Service Unavailable", "text/plain", error=True)
+            query = urllib.parse.parse_qs(url.query)
+            if url.path == "/cfp/call":
+                category = os.path.basename(query.get("conference", [""])[0]).replace(" ", "_")
+                page = os.path.basename(query.get("page", ["1"])[0])
+                filename = os.path.join("wikicfp_call", category, f"{page}.html")
+            else:
+                acronym = query.get("q", [""])[0]
+                filename = os.path.join("wikicfp", f"{os.path.basename(acronym)}.html")
+            content_type = "text/html"
+        elif url.path == "/":
+            filename, content_type = "ggs_index.html", "text/html"
+        else:
+            return self.count(404, b"Not Found", "text/plain")
+
+        filename = os.path.join(self.fixtures_dir, filename)
+        if os.path.exists(filename):
+            with open(filename, 'rb') as f:
+                body = f.read()
+        elif content_type == "text/html":  # No results
+            body = WIKICFP_PAGE.format(rows="").encode("utf-8")
+        else:
+            return self.count(404, b"Not Found", "text/plain")
+
+        # Conditional requests (ETag)
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        with self._lock:
+            self.etags[path] = etag
+        if headers is not None and headers.get("If-None-Match") == etag:
+            with self._lock:
+                self.not_modified += 1
+            return self.count(304, b"", content_type)
+        return self.count(200, body, content_type)
+
+    def count(self, status, body, content_type, error=False):
+        with self._lock:
+            self.requests += 1
+            self.bytes += len(body)
+            self.errors += int(error)
+        return status, body, content_type
@@ -0,0 +1,297 @@
+import os
+import time
+import zlib
+import json
+import pickle
+import hashlib
+import sqlite3
+import datetime
+import threading
+from pathlib import Path
+
+from call4papers.profiling import count
+
+
+def get_cache_dir(cache_dir=None):
+    # Create cache folder if it does not exists
+    cache_dir = os.path.abspath(cache_dir or os.path.join(os.path.dirname(__file__), ".cache"))
+    p = Path(cache_dir)
+    p.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_core_filename(cache_dir="."):
+    year = int(datetime.datetime.now().year)
+    core_code = f"CORE{year}"
+    return os.path.join(cache_dir, f"cache_{core_code.lower()}.csv"), core_code
+
+
+def get_ggs_filename(cache_dir="."):
+    return os.path.join(cache_dir, f"cache_gii-grin-scie.xlsx")
+
+
+def get_aliases_filename(cache_dir="."):
+    # CORE <=> GGS acronyms of the same venue (reviewable)
+    return os.path.join(cache_dir, "aliases.csv")
+
+
+def get_validators_path(filename):
+    return filename + ".validators.json"
+
+
+def load_validators(filename):
+    # ETag, Last-Modified and content hash of a cached source file, and when it was last checked
+    path = get_validators_path(filename)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):  # Corrupted: revalidate from scratch
+        return {}
+
+
+def save_validators(filename, validators):
+    # Write atomically
+    path = get_validators_path(filename)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(validators, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_fresh(filename, validators, max_age=None):
+    # max_age: seconds since the last check (None means never stale). Files without validators use their mtime
+    if max_age is None:
+        return True
+    checked_at = validators.get("checked_at") or os.path.getmtime(filename)
+    return time.time() - checked_at <= max_age
+
+
+class WikiCFPCache:
+    # Persistent cache of WikiCFP search pages, keyed by (acronym, year filter)
+
+    def __init__(self, path, ttl=24 * 3600):
+        self.path = path
+        self.ttl = ttl  # Seconds. None means no expiration
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # Shared by the lookup threads (guarded by the lock)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS wikicfp ("
+                          "acronym TEXT NOT NULL, year TEXT NOT NULL, fetched_at REAL NOT NULL, html BLOB NOT NULL, "
+                          "PRIMARY KEY (acronym, year))")
+
+        # Generation: incremented on every write, so the results computed from the cache know when it changed
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)")
+        self.conn.commit()
+
+    def get(self, acronym, year):
+        with self._lock:
+            row = self.conn.execute("SELECT fetched_at, html FROM wikicfp WHERE acronym=? AND year=?",
+                                    (acronym, year)).fetchone()
+
+            # Check freshness
+            if row is None or (self.ttl is not None and time.time() - row[0] > self.ttl):
+                self.misses += 1
+                count("wikicfp_cache_misses")
+                return None
+            self.hits += 1
+            count("wikicfp_cache_hits")
+        return zlib.decompress(row[1]).decode("utf-8")
+
+    def set(self, acronym, year, html):
+        data = zlib.compress(html.encode("utf-8"))
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO wikicfp (acronym, year, fetched_at, html) VALUES (?, ?, ?, ?)",
+                              (acronym, year, time.time(), data))
+            self.conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            self.conn.commit()
+
+    def purge(self, expired_only=False):
+        with self._lock:
+            if expired_only and self.ttl is not None:
+                cursor = self.conn.execute("DELETE FROM wikicfp WHERE fetched_at < ?", (time.time() - self.ttl,))
+            else:
+                cursor = self.conn.execute("DELETE FROM wikicfp")
+            self.conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+            self.conn.commit()
+            self.conn.execute("VACUUM")
+        return cursor.rowcount
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM wikicfp").fetchone()[0]
+
+    def generation(self):
+        with self._lock:
+            return self.conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def get_wikicfp_cache(cache_dir, ttl=24 * 3600):
+    return WikiCFPCache(os.path.join(cache_dir, "cache_wikicfp.sqlite"), ttl=ttl)
+
+
+HISTORY_VERSION = 1  # Bump when the layout of the rank history changes (the store is rebuilt)
+
+
+class RankHistory:
+    # Long-format store of the CORE ranks of past editions: one row per (acronym, edition)
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+
+        # Versioned layout: an old store is dropped (its editions are downloaded again)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != HISTORY_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS ranks")
+            self.conn.execute("DROP TABLE IF EXISTS editions")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (HISTORY_VERSION,))
+
+        # Clustered by acronym (WITHOUT ROWID: the primary key is the index on acronym, with no extra copy)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS ranks ("
+                          "acronym TEXT NOT NULL, edition TEXT NOT NULL, rank TEXT NOT NULL, "
+                          "PRIMARY KEY (acronym, edition)) WITHOUT ROWID")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS editions ("
+                          "edition TEXT PRIMARY KEY, fetched_at REAL NOT NULL, n_rows INTEGER NOT NULL)")
+        self.conn.commit()
+
+    def editions(self):
+        with self._lock:
+            return {row[0] for row in self.conn.execute("SELECT edition FROM editions")}
+
+    def add(self, edition, rows):
+        # rows: (acronym, rank). Replaces the edition in one transaction (homonyms: the first row is kept)
+        with self._lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM ranks WHERE edition = ?", (edition,))
+                self.conn.executemany("INSERT OR IGNORE INTO ranks (acronym, edition, rank) VALUES (?, ?, ?)",
+                                      ((acronym, edition, rank) for acronym, rank in rows))
+                n_rows = self.conn.execute("SELECT COUNT(*) FROM ranks WHERE edition = ?", (edition,)).fetchone()[0]
+                self.conn.execute("INSERT OR REPLACE INTO editions (edition, fetched_at, n_rows) VALUES (?, ?, ?)",
+                                  (edition, time.time(), n_rows))
+        return n_rows
+
+    def get(self, editions=None, acronyms=None):
+        # (acronym, edition, rank) rows of some editions and/or acronyms (None means all)
+        query, params = "SELECT acronym, edition, rank FROM ranks", []
+        conditions = []
+        for column, values in [("edition", editions), ("acronym", acronyms)]:
+            if values is not None:
+                values = sorted(set(values))
+                conditions.append(f"{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            return self.conn.execute(query, params).fetchall()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM ranks").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def get_rank_history(cache_dir):
+    return RankHistory(os.path.join(cache_dir, "core_history.sqlite"))
+
+
+SNAPSHOT_VERSION = 1  # Bump when the normalized schema changes
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_snapshot_path(filename):
+    return os.path.splitext(filename)[0] + ".snapshot.pkl"
+
+
+def load_snapshot(filename, source_hash=None):
+    # Return the normalized table if the snapshot matches the raw file (source_hash: its hash, if already known)
+    path = get_snapshot_path(filename)
+    if not os.path.exists(path) or not os.path.exists(filename):
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):  # Corrupted or incompatible
+        return None
+
+    source_hash = source_hash or file_hash(filename)
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("source_hash") != source_hash:
+        count("snapshot_misses")
+        return None
+    count("snapshot_hits")
+    return snapshot["df"]
+
+
+def save_snapshot(filename, df, source_hash=None):
+    # source_hash: hash of the raw file that was parsed (hashing it now could pick a newer version of the file)
+    path = get_snapshot_path(filename)
+    snapshot = {"version": SNAPSHOT_VERSION, "source_hash": source_hash or file_hash(filename), "df": df}
+
+    # Write atomically
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+class Checkpoint:
+    # Append-only JSON Lines file with the completed lookups of a run
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = {}
+
+        # Load completed entries (a truncated last line is ignored)
+        if resume and os.path.exists(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.done[entry["key"]] = entry["value"]
+        self.f = open(path, 'a' if resume else 'w')
+
+    def append(self, key, value):
+        self.f.write(json.dumps({"key": key, "value": value}) + "\n")
+        self.f.flush()
+        self.done[key] = value
+
+    def close(self):
+        self.f.close()
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def get_run_id(output_file):
+    # Runs are identified by their output file
+    return hashlib.sha1(os.path.abspath(str(output_file)).encode("utf-8")).hexdigest()[:12]
+
+
+def get_checkpoint(cache_dir, output_file, resume=False):
+    return Checkpoint(os.path.join(cache_dir, f"checkpoint_{get_run_id(output_file)}.jsonl"), resume=resume)
@@ -1,4 +1,28 @@
-MINIMAL_COLUMNS = ["Acronym",  "Title",  "Max rank", "Acceptance Rate", "CORE rank", "GGS Class",  "deadline",  "when",  "where"]
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/95.0.4638.69 Safari/537.36"
+WIKICFP_URL = "http://www.wikicfp.com/cfp/servlet/tool.search"
+WIKICFP_CATEGORY_URL = "http://www.wikicfp.com/cfp/call"
+CORE_URL = "http://portal.core.edu.au/conf-ranks/"
+GGS_URL = "https://scie.lcc.uma.es:8443/"
+SOURCE_MAX_AGE = 7 * 24 * 3600  # Seconds before CORE and GGS are revalidated (conditional requests)
+SOURCE_TIMEOUT = 30.0  # Seconds without a response before a CORE or GGS download fails
+
+# Past CORE editions of the rank history (--core-history), as the "source" values of the portal (the 2010 edition is
+# the ERA list). The current edition is always the last one
+CORE_EDITIONS = ["CORE2008", "ERA2010", "CORE2013", "CORE2014", "CORE2017", "CORE2018", "CORE2020", "CORE2021",
+                 "CORE2023"]
+RANK_TRENDS = ["up", "down", "stable", "new", "dropped"]
+
+MINIMAL_COLUMNS = ["Acronym",  "Title",  "Max rank", "Acceptance Rate", "CORE rank", "CORE trend", "CORE history", "GGS Class",  "deadline",  "when",  "where"]
+
+# Ranks (best first) and their score for the "Max rank" column
+CORE_RANKS = ["A*", "A", "B", "C"]
+GGS_CLASSES = ["1", "2", "3"]
+RANK_SCORES = {"A*": 200, "1": 200, "A": 150, "2": 150, "B": 100, "3": 100, "C": 30}
+
+# WikiCFP call listings crawled in bulk mode (--bulk)
+WIKICFP_CATEGORIES = ["artificial intelligence", "machine learning", "natural language processing",
+                      "computational linguistics", "computer vision", "data mining", "robotics",
+                      "information retrieval"]
 
 DEFAULT_SETUPS = {
     "nlp": {
@@ -210,4 +234,4 @@ ACCEPTANCE_RATE = {
     # "AMTA": 00.0,  #  ?
     # "EAMT": 00.0,  #  ?
 }
-ACCEPTANCE_RATE = {k: v/100 for k,v in ACCEPTANCE_RATE.items()}  # Range between 0 and 1
\ No newline at end of file
+ACCEPTANCE_RATE = {k: v/100 for k,v in ACCEPTANCE_RATE.items()}  # Range between 0 and 1
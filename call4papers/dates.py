@@ -0,0 +1,81 @@
+import re
+from functools import lru_cache
+
+import dateutil.parser
+import pandas as pd
+
+from call4papers.profiling import timed, count
+
+# WikiCFP formats ("Mar 3, 2022"), tried in order. The format that parses the most values moves to the front
+DATE_FORMATS = ["%b %d, %Y", "%Y-%m-%d", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%b %Y"]
+BRACKETS = re.compile(r"\(.*\)")  # "Mar 3, 2022 (Feb 20, 2022)" => abstract deadline
+MISSING = {"", "N/A", "TBD", "TBA"}
+
+
+@lru_cache(maxsize=4096)
+def parse_date_fallback(date):
+    # Odd formats only (one dateutil call per distinct string)
+    try:
+        return pd.Timestamp(dateutil.parser.parse(date).date())
+    except (dateutil.parser.ParserError, OverflowError, ValueError):
+        return pd.NaT
+
+
+@timed("normalize_dates")
+def parse_dates(values, verbose=True):
+    # Parse each distinct string once: fast path per known format, dateutil for the rest
+    values = pd.Series(values, dtype="object")
+    text = values.where(values.notnull(), None).astype("string").str.replace(BRACKETS, "", regex=True).str.strip()
+    uniques = pd.Index(text.dropna().unique())
+    uniques = uniques[~uniques.isin(MISSING)]
+
+    parsed = pd.Series(pd.NaT, index=uniques, dtype="datetime64[ns]")
+    remaining = uniques
+    hits = {}
+    for fmt in DATE_FORMATS:
+        if len(remaining) == 0:
+            break
+        dates = pd.to_datetime(remaining, format=fmt, errors="coerce")
+        ok = ~dates.isna()
+        parsed[remaining[ok]] = dates[ok]
+        hits[fmt] = int(ok.sum())
+        remaining = remaining[~ok]
+    DATE_FORMATS.sort(key=lambda fmt: -hits.get(fmt, 0))  # Stable: ties keep their order
+
+    for date in remaining:
+        parsed[date] = parse_date_fallback(date)
+        if pd.isnull(parsed[date]):
+            count("date_parse_failures")
+            if verbose:
+                print(f"\t=>[INVALID DATE]: {date}")
+
+    # Reindex (not map): mapping with an empty datetime Series fails when nothing parses
+    return pd.Series(parsed.reindex(text).to_numpy(dtype="datetime64[ns]"), index=values.index)
+
+
+def parse_when(values):
+    # "Jun 1, 2022 - Jun 5, 2022" => (start, end). A single date is both
+    values = pd.Series(values, dtype="object")
+    parts = values.where(values.notnull(), None).astype("string").str.split(" - ", n=1, expand=True)
+    parts = parts.reindex(columns=[0, 1])  # Empty or all-missing values have fewer columns
+    start = parse_dates(parts[0], verbose=False)
+    end = parse_dates(parts[1].fillna(parts[0]), verbose=False)
+    return start, end
+
+
+def normalize_deadlines(df, verbose=True):
+    # Typed columns: deadline, when start/end (datetime64) and event year (Int64)
+    if "deadline" not in df.columns:
+        df = df.assign(**{c: None for c in ["Event year", "when", "where", "deadline"] if c not in df.columns})
+
+    when_start, when_end = parse_when(df["when"])
+    return df.assign(**{"deadline": parse_dates(df["deadline"], verbose=verbose),
+                        "when start": when_start,
+                        "when end": when_end,
+                        "Event year": pd.to_numeric(df["Event year"], errors="coerce").astype("Int64")})
+
+
+def filter_in_time(df, today=None):
+    # Deadlines that have not passed (missing deadlines are dropped)
+    today = pd.Timestamp.today().normalize() if today is None else today
+    return df[df["deadline"] >= today]
@@ -0,0 +1,101 @@
+import re
+from functools import lru_cache
+
+from call4papers.profiling import timed
+
+
+def build_trie(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True  # End of word
+    return trie
+
+
+def trie_to_regex(node):
+    # Alternation with the shared prefixes factored out: at each position, the words that share a prefix are
+    # rejected together instead of one by one. Still a backtracking regex (no failure links, unlike Aho–Corasick)
+    alternatives = [re.escape(ch) + trie_to_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not alternatives:
+        return ""
+
+    regex = alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+    if "" in node:  # A word ends here
+        regex = f"(?:{regex})?"
+    return regex
+
+
+@lru_cache(maxsize=128)
+def compile_matcher(words, word_boundary=False):
+    regex = trie_to_regex(build_trie(sorted(w.lower() for w in words)))
+    if word_boundary:
+        regex = f"\\b(?:{regex})\\b"
+    return re.compile(regex)
+
+
+def normalize_ranks(series):
+    return series.apply(str).str.strip().str.upper()
+
+
+def get_filter_columns(df):
+    # Normalized columns shared by all the filters (computed once per table)
+    text = df['Title'].fillna("").apply(str).str.lower()
+    if "GGS_title" in df.columns:
+        text = text + "\n" + df['GGS_title'].fillna("").apply(str).str.lower()
+
+    ranks = [normalize_ranks(df[c]) for c in ["Rank", "GGS Class"] if c in df.columns]
+    acronyms = df['Acronym'].fillna("").apply(str).str.lower()
+    if "Alias" in df.columns:  # Acronym in the other source
+        acronyms = acronyms + " " + df['Alias'].fillna("").apply(str).str.lower()
+    trends = df["CORE trend"] if "CORE trend" in df.columns else None  # Rank history
+    return {"text": text, "ranks": ranks, "acronyms": acronyms, "trends": trends}
+
+
+@timed("filter")
+def filter_conferences(df, keywords, nokeywords, whitelist, blacklist, ratings, trends=None, columns=None):
+    columns = columns if columns is not None else get_filter_columns(df)
+    mask = True
+
+    # Filter by keywords
+    if keywords:
+        mask2 = columns["text"].str.contains(compile_matcher(frozenset(keywords)), regex=True)
+        mask = mask & mask2
+
+    # Filter by keywords
+    if nokeywords:
+        mask2 = columns["text"].str.contains(compile_matcher(frozenset(nokeywords)), regex=True)
+        mask = mask & ~mask2
+
+    # Filter by rating
+    if ratings:
+        ratings = {str(rat).strip().upper() for rat in ratings}
+        mask2 = False
+        for ranks in columns["ranks"]:
+            mask2 = mask2 | ranks.isin(ratings)
+        mask = mask & mask2
+
+    # Filter by CORE rank trend (up, down, stable, new, dropped)
+    if trends:
+        if columns["trends"] is None:
+            raise ValueError("The CORE rank history is not loaded (see --core-history)")
+        mask = mask & columns["trends"].isin({str(t).strip().lower() for t in trends})
+
+    # Filter by acronym: blacklist
+    if blacklist == "all":  # Trick. Block all but whitelist
+        mask = False
+
+    elif blacklist:
+        mask2 = columns["acronyms"].str.contains(compile_matcher(frozenset(blacklist), word_boundary=True), regex=True)
+        mask = mask & ~mask2
+
+    # Filter by acronym: whitelist
+    if whitelist:
+        mask2 = columns["acronyms"].str.contains(compile_matcher(frozenset(whitelist), word_boundary=True), regex=True)
+        mask = mask | mask2
+
+    # Apply mask
+    if mask is True or mask is False:  # No filters
+        return df if mask else df.iloc[0:0]
+    return df[mask]
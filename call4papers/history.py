@@ -0,0 +1,106 @@
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import requests
+
+from call4papers.constants import CORE_URL, RANK_SCORES
+from call4papers.profiling import timed, stage, count
+from call4papers.sources import CORE_HEADER, conditional_get, get_core_url
+from call4papers.cache import get_rank_history
+
+
+def get_edition_year(edition):
+    # "CORE2021" => "2021", "ERA2010" => "2010"
+    return edition[-4:]
+
+
+def parse_edition(text):
+    # CSV export => (acronym, rank) rows
+    df = pd.read_csv(io.StringIO(CORE_HEADER + text), usecols=["Acronym", "Rank"], dtype=str)
+    df = df.assign(Acronym=df["Acronym"].str.strip().str.upper(), Rank=df["Rank"].str.strip())
+    df = df[(df["Acronym"].str.len() >= 2) & df["Rank"].notna()]
+    return list(zip(df["Acronym"], df["Rank"]))
+
+
+def fetch_edition(edition, base_url=CORE_URL):
+    response = conditional_get(get_core_url(edition, base_url), name=edition)
+    rows = parse_edition(response.text)
+    if not rows:  # E.g. an HTML page or an unknown edition. Stored editions are never downloaded again
+        raise ValueError("no ranks found in the response")
+    return rows
+
+
+@timed("load.history")
+def load_rank_history(editions, cache_dir=".", base_url=CORE_URL, force_download=False, concurrency=4):
+    # Past editions do not change: only the ones missing from the store are downloaded (in parallel)
+    history = get_rank_history(cache_dir)
+    try:
+        stored = history.editions()
+        missing = [e for e in editions if force_download or e not in stored]
+        count("history_editions_stored", len(editions) - len(missing))
+        if missing:
+            print(f"Downloading {len(missing)} CORE editions ({', '.join(missing)})...")
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(missing))) as executor:
+                futures = {executor.submit(fetch_edition, edition, base_url): edition for edition in missing}
+                for future in as_completed(futures):
+                    edition = futures[future]
+                    try:
+                        rows = future.result()
+                    except (ConnectionError, requests.RequestException, ValueError) as e:  # Retried by the next run
+                        print(f"\t=>[ERROR]: The edition {edition} could not be downloaded ({e})")
+                        continue
+                    print(f"Edition {edition} stored! ({history.add(edition, rows)} rows)")
+                    count("history_editions_downloaded")
+
+        with stage("load.history.read"):
+            rows = history.get(editions=editions)
+    finally:
+        history.close()
+    return pd.DataFrame(rows, columns=["acronym", "edition", "rank"])
+
+
+def get_history_columns(df_history, editions):
+    # Long (acronym, edition, rank) => one row per acronym. editions: oldest first
+    wide = df_history.pivot(index="acronym", columns="edition", values="rank").reindex(columns=editions)
+    ranks = wide.to_numpy(dtype=object)
+    present = wide.notna().to_numpy()
+    scores = np.vectorize(lambda r: RANK_SCORES.get(r, 0), otypes=[np.int64])(np.where(present, ranks, ""))
+
+    # First and last editions where the venue is ranked
+    rows = np.arange(len(wide))
+    first = scores[rows, present.argmax(axis=1)]
+    last = scores[rows, present.shape[1] - 1 - present[:, ::-1].argmax(axis=1)]
+    n_editions = present.sum(axis=1)
+    trend = np.select([~present[:, -1], n_editions == 1, last > first, last < first],
+                      ["dropped", "new", "up", "down"], "stable")
+
+    # Rank changes between consecutive editions (missing editions are skipped)
+    previous = wide.ffill(axis=1).to_numpy(dtype=object)
+    changes = ((ranks[:, 1:] != previous[:, :-1]) & present[:, 1:] & pd.notna(previous[:, :-1])).sum(axis=1)
+
+    years = [get_edition_year(e) for e in editions]
+    history = [" ".join(f"{y}:{r}" for y, r, p in zip(years, row_ranks, row_present) if p)
+               for row_ranks, row_present in zip(ranks, present)]
+    return pd.DataFrame({"Acronym": wide.index, "CORE history": history, "CORE trend": trend,
+                         "CORE changes": changes})
+
+
+@timed("history")
+def add_rank_history(df, df_history, df_core, core_code, ref_source="all"):
+    # The current edition (already loaded) is the last one of the history
+    current = pd.DataFrame({"acronym": df_core["Acronym"], "edition": core_code,
+                            "rank": df_core["Rank"].map(lambda r: str(r).strip(), na_action="ignore")})
+    df_history = pd.concat([df_history[df_history["edition"] != core_code], current.dropna()], ignore_index=True)
+    df_history = df_history.drop_duplicates(["acronym", "edition"])
+    editions = sorted(set(df_history["edition"]), key=get_edition_year)
+    columns = get_history_columns(df_history, editions)
+
+    # CORE acronyms renamed to those of GGS keep the CORE one as alias
+    key = df["Acronym"]
+    if ref_source == "ggs" and "Alias" in df.columns:
+        key = df["Alias"].fillna(df["Acronym"])
+    columns = columns.rename(columns={"Acronym": "_history_key"})
+    df = df.assign(_history_key=key.to_numpy()).merge(columns, on="_history_key", how="left")
+    return df.drop(columns=["_history_key"]).astype({"CORE changes": "Int64"})
@@ -0,0 +1,189 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from call4papers.constants import WIKICFP_URL, WIKICFP_CATEGORY_URL, CORE_URL, GGS_URL, SOURCE_MAX_AGE
+from call4papers.sources import get_cache_dir, load_core_conferences, load_ggs_conferences, merge_conferences, \
+    filter_invalid_rows
+from call4papers.filters import filter_conferences, get_filter_columns
+from call4papers.wikicfp import fetch_events, crawl_categories, join_deadlines, normalize_acronym
+from call4papers.profiling import count
+from call4papers.dates import normalize_deadlines, filter_in_time
+from call4papers.schema import apply_schema, get_acceptance_rates
+from call4papers.resolution import resolve_aliases
+from call4papers.cache import get_wikicfp_cache, get_aliases_filename, get_core_filename
+
+
+class ConferenceIndex:
+    # CORE and GGS are loaded and merged once. WikiCFP lookups are done lazily and memoized per acronym
+
+    def __init__(self, cache_dir=None, force_download=False, ref_source="all", ignore_ggs=False, ignore_wikicfp=False,
+                 concurrency=16, timeout=10.0, retries=3, use_cache=True, cache_ttl=24*3600,
+                 core_url=CORE_URL, ggs_url=GGS_URL, wikicfp_url=WIKICFP_URL, categories=None, max_pages=20,
+                 wikicfp_category_url=WIKICFP_CATEGORY_URL, aliases=True, alias_threshold=85, prefetch=None,
+                 source_max_age=SOURCE_MAX_AGE, background_refresh=False, core_editions=None):
+        self.cache_dir = get_cache_dir(cache_dir)
+        self.force_download = force_download
+        self.ignore_wikicfp = ignore_wikicfp
+        self.use_cache = use_cache
+        self.cache_ttl = cache_ttl
+        self.fetch_args = {"concurrency": concurrency, "timeout": timeout, "retries": retries, "base_url": wikicfp_url}
+
+        # Bulk mode: WikiCFP call listings (crawled once), with per-acronym searches for the rest
+        self.categories = list(categories) if categories else None
+        self.crawl_args = {"concurrency": concurrency, "timeout": timeout, "retries": retries,
+                           "max_pages": max_pages, "base_url": wikicfp_category_url}
+        self.listed = None
+        self._crawl_lock = threading.Lock()
+
+        # WikiCFP events per (normalized) acronym. The listing hits only have open calls: they are kept apart
+        # (for in-time queries only) until the acronym is searched
+        self.events = {}
+        self.listed_events = {}
+        self._lock = threading.Lock()
+
+        # Get CORE and GGS conferences, and the past CORE editions (downloaded and parsed concurrently)
+        self._prefetch = None
+        sources = {}
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            source_args = {"force_download": force_download, "cache_dir": self.cache_dir, "max_age": source_max_age,
+                           "background": background_refresh}
+            futures = {executor.submit(load_core_conferences, base_url=core_url, **source_args): "core"}
+            if not ignore_ggs:
+                futures[executor.submit(load_ggs_conferences, base_url=ggs_url, **source_args)] = "ggs"
+            if core_editions is not None:
+                from call4papers.history import load_rank_history
+                futures[executor.submit(load_rank_history, list(core_editions), cache_dir=self.cache_dir,
+                                        base_url=core_url, force_download=force_download)] = "history"
+
+            for future in as_completed(futures):
+                name = futures[future]
+                sources[name] = future.result()
+
+                # The acronyms of the first source tell which ones to look up while the other one is loading
+                if prefetch and self._prefetch is None and not ignore_wikicfp and name != "history" \
+                        and (ignore_ggs or ref_source in {"all", name}):
+                    self.prefetch(set(prefetch).intersection(sources[name]["Acronym"]))
+        df_core, df_ggs = sources["core"], sources.get("ggs")
+
+        # Add GGS information
+        if not ignore_ggs:
+            alias_table = None
+            if aliases:  # Fuzzy CORE <=> GGS matches (cached)
+                alias_table = resolve_aliases(df_core, df_ggs, get_aliases_filename(self.cache_dir),
+                                              threshold=alias_threshold, force=force_download)
+            df = merge_conferences(df_core, df_ggs, ref_source=ref_source, aliases=alias_table)
+        else:  # alias
+            df = df_core
+            df["Title"] = df["CORE_title"]  # Create reference title
+
+        # Add the CORE rank history (one row per acronym: history, trend and number of changes)
+        if core_editions is not None:
+            from call4papers.history import add_rank_history
+            _, core_code = get_core_filename(self.cache_dir)
+            df = add_rank_history(df, sources["history"], df_core, core_code, ref_source=ref_source)
+
+        # Normalize the filter columns once
+        self.df = apply_schema(filter_invalid_rows(df))
+        self.columns = get_filter_columns(self.df)
+
+    def __len__(self):
+        return len(self.df)
+
+    def filter(self, keywords=None, nokeywords=None, whitelist=None, blacklist=None, ratings=None, trends=None):
+        return filter_conferences(self.df, keywords=keywords, nokeywords=nokeywords, whitelist=whitelist,
+                                  blacklist=blacklist, ratings=ratings, trends=trends, columns=self.columns)
+
+    def prefetch(self, acronyms):
+        # Look up in the background (see wait)
+        if acronyms:
+            executor = ThreadPoolExecutor(max_workers=1)
+            self._prefetch = executor.submit(self.enrich, sorted(acronyms), wait=False)
+            executor.shutdown(wait=False)
+
+    def wait(self):
+        # Lookups started in advance (see prefetch)
+        if self._prefetch is not None:
+            self._prefetch.result()
+            self._prefetch = None
+
+    def enrich(self, acronyms, known=None, checkpoint=None, refresh=None, wait=True, in_time=False):
+        if wait:
+            self.wait()
+
+        # Look up the acronyms that are not memoized yet
+        with self._lock:
+            events = dict(self.events)
+        if known:
+            events.update(known)
+
+        refresh = self.force_download if refresh is None else refresh
+        cache = get_wikicfp_cache(self.cache_dir, ttl=self.cache_ttl) if self.use_cache else None
+        found = {}
+        try:
+            # Bulk mode: the acronyms found in the listings are not searched one by one. The listings only have
+            # open calls, so they are used only when the past deadlines are not shown
+            if self.categories and in_time:
+                listed = self.crawl(cache=cache)
+                keys = {normalize_acronym(acronym) for acronym in acronyms}.difference(events)
+                found = {k: listed[k] for k in keys if k in listed}
+                events.update(found)
+                count("wikicfp_listing_hits", len(found))
+                print(f"WikiCFP categories: {len(found)} of {len(keys)} conferences found in the listings")
+
+            events = fetch_events(acronyms, known=events, cache=cache, refresh=refresh, checkpoint=checkpoint,
+                                  **self.fetch_args)
+        finally:
+            if cache is not None:
+                cache.close()
+
+        # Only the searched acronyms are memoized as complete
+        with self._lock:
+            searched = {k: v for k, v in events.items() if k not in found}
+            self.events.update(searched)
+            self.listed_events.update(found)
+            for k in searched:
+                self.listed_events.pop(k, None)
+        return events
+
+    def is_listed(self, key):
+        # Events taken from the listings (open calls only)
+        with self._lock:
+            return key in self.listed_events
+
+    def crawl(self, cache=None):
+        with self._crawl_lock:
+            if self.listed is None:
+                self.listed = crawl_categories(self.categories, cache=cache, refresh=self.force_download,
+                                               **self.crawl_args)
+            return self.listed
+
+    def join(self, df, in_time=False, verbose=True):
+        # Add the WikiCFP information (one row per event year)
+        keys = {normalize_acronym(acronym) for acronym in df["Acronym"]}
+        with self._lock:
+            events = {k: v for k, v in self.events.items() if k in keys}
+            if in_time:
+                events.update({k: v for k, v in self.listed_events.items() if k in keys and k not in events})
+        df = apply_schema(join_deadlines(df, events, verbose=verbose))
+
+        # Typed dates (parsed once for the whole table)
+        df = normalize_deadlines(df, verbose=verbose)
+
+        # Show only conferences where the deadline has not passed
+        if in_time:
+            df = filter_in_time(df)
+        return df
+
+    def query(self, keywords=None, nokeywords=None, whitelist=None, blacklist=None, ratings=None, trends=None,
+              in_time=False):
+        df = self.filter(keywords=keywords, nokeywords=nokeywords, whitelist=whitelist, blacklist=blacklist,
+                         ratings=ratings, trends=trends)
+
+        # Add Wikicfp information
+        if not self.ignore_wikicfp:
+            self.enrich(df["Acronym"], in_time=in_time)
+            df = self.join(df, in_time=in_time)
+
+        # Add extra values
+        df = df.assign(**{"Acceptance Rate": get_acceptance_rates(df["Acronym"])})
+        return df
@@ -1,281 +1,32 @@
 import os
-import math
+import sys
+import json
 import argparse
-import datetime
+import cProfile
 
-import dateutil.parser
-import requests
-import re
-from pathlib import Path
+# Only light modules here: pandas, requests, bs4, lxml,... are imported by the stages that need them,
+# so '--help' and the cache commands start fast
+from call4papers.constants import MINIMAL_COLUMNS, DEFAULT_SETUPS, WIKICFP_URL, WIKICFP_CATEGORY_URL, \
+    WIKICFP_CATEGORIES, CORE_URL, GGS_URL, SOURCE_MAX_AGE, CORE_EDITIONS, RANK_TRENDS
+from call4papers.sinks import OUTPUT_FORMATS, SQLITE_KEY, get_output_format, save_output
+from call4papers.profiling import PROFILER, stage, timed
+from call4papers.cache import get_cache_dir, get_wikicfp_cache, get_checkpoint
+from call4papers.results import ResultCache, RESULT_FORMATS, get_result_key
 
-import urllib.parse
-from urllib.error import HTTPError
-import multiprocessing as mp
 
-import pandas as pd
-from thefuzz import process
-from tqdm import tqdm
-from bs4 import BeautifulSoup
-from  dateutil.parser import parse
+@timed("prettify")
+def prettify_csv(df, show_extra, keep=()):
+    from call4papers.schema import get_max_rank
 
-from call4papers.constants import MINIMAL_COLUMNS, DEFAULT_SETUPS, ACCEPTANCE_RATE
-
-
-def get_core_conferences(force_download, cache_dir="."):
-    # Get filename
-    year = int(datetime.datetime.now().year)
-    core_code = f"CORE{year}"
-    filename = os.path.join(cache_dir, f"cache_{core_code.lower()}.csv")
-
-    # Get conferences
-    if not force_download and os.path.exists(filename):  # Load file
-        print(f"Loading from cache... ({os.path.abspath(filename)})")
-        df = pd.read_csv(filename)
-        print(f"File CORE loaded! ({len(df)} rows)")
-    else:
-        # Scrape CORE
-        print("No cached file. The CORE download is about to start...")
-        df = scrape_core_conferences(savepath=filename, core_code=core_code)
-        print("CORE scraped!")
-
-    # Remove index and last two rows
-    df = df.drop(df.columns[[0, 7, 8, 9]], axis=1)
-    return df
-
-
-def scrape_core_conferences(savepath, core_code):
-    url = f"http://portal.core.edu.au/conf-ranks/?search=&by=all&source={core_code}&sort=atitle&page=1&do=Export"
-
-    # Download file
-    response = requests.get(url, allow_redirects=True)
-    if response.status_code != 200:
-        raise ConnectionError("Invalid request for CORE")
-
-    # Save csv
-    with open(savepath, 'w') as f:
-        f.write("Index,Title,Acronym,Source,Rank,DBLP,hasData?,Primary FoR,Comments,Average Rating\n")
-        f.write(response.text)
-    print("File saved!")
-
-    # Open file
-    df = pd.read_csv(savepath)
-    return df
-
-
-def get_ggs_conferences(force_download, cache_dir="."):
-    filename = os.path.join(cache_dir, f"cache_gii-grin-scie.xlsx")
-
-    # Get conferences
-    if not force_download and os.path.exists(filename):  # Load file
-        print(f"Loading GGS from cache... ({os.path.abspath(filename)})")
-        df = pd.read_excel(filename, header=[1])
-        print(f"File loaded! ({len(df)} rows)")
-    else:
-        # Scrape CORE
-        print("No cached file. The GGS download is about to start...")
-        df = scrape_ggs_conferences(savepath=filename)
-        print("GGS scraped!")
-    return df
-
-
-def scrape_ggs_conferences(savepath):
-    ggs_url = "https://scie.lcc.uma.es:8443/"
-
-    # Get index
-    print("Downloading conferences from 'scie.lcc.uma.es'...")
-    response = requests.get(
-        url=ggs_url,
-        headers={
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/95.0.4638.69 Safari/537.36",
-        }
-    )
-
-    # Check correctness
-    if response.status_code != 200:
-        raise ConnectionError("Invalid request for GGS")
-
-    # Get XLXS file
-    soup = BeautifulSoup(response.text, 'lxml')
-    xlxs_href = soup.select_one("#text > div.entry > table:nth-child(1) > tbody > tr > td:nth-child(2) > a[href]").attrs["href"]
-    xlxs_href = urllib.parse.urljoin(ggs_url, xlxs_href)
-
-    # Download file
-    response = requests.get(xlxs_href, allow_redirects=True)
-    if response.status_code != 200:
-        raise ConnectionError("Invalid request for GGS")
-
-    # Save xlsx
-    with open(savepath, 'wb') as f:
-        f.write(response.content)
-    print("File saved!")
-
-    # Open file
-    df = pd.read_excel(savepath, header=[1])
-    return df
-
-
-def filter_invalid_rows(df):
-    # Remove specific values
-    df = df[df["Title"].apply(lambda x: isinstance(x, str) and len(x) >= 2)]
-    df = df[df["Acronym"].apply(lambda x: isinstance(x, str) and len(x) >= 2)]
-    return df
-
-
-def filter_conferences(df, keywords, nokeywords, whitelist, blacklist, ratings):
-    mask = True
-
-    # Filter by keywords
-    if keywords:
-        kw_filter = '|'.join(keywords).lower()
-        mask2 = df['Title'].str.contains(kw_filter, case=False, regex=True)
-        if "GGS_title" in df.columns:
-            mask2 = mask2 | df['GGS_title'].str.contains(kw_filter, case=False, regex=True)
-        mask = mask & mask2
-
-    # Filter by keywords
-    if nokeywords:
-        kw_filter = '|'.join(nokeywords).lower()
-        mask2 = df['Title'].str.contains(kw_filter, case=False, regex=True)
-        if "GGS_title" in df.columns:
-            mask2 = mask2 | df['GGS_title'].str.contains(kw_filter, case=False, regex=True)
-        mask = mask & ~mask2
-
-    # Filter by rating
-    if ratings:
-        mask2 = df['Rank'].apply(lambda x: any(str(x).strip().upper() == str(rat).strip().upper() for rat in ratings))
-        if "GGS Class" in df.columns:
-            mask2 = mask2 | df['GGS Class'].apply(lambda x: any(str(x).strip().upper() == str(rat).strip().upper() for rat in ratings))
-        mask = mask & mask2
-
-    # Filter by acronym: blacklist
-    if blacklist:
-        kw_filter = f"\\b(?:{'|'.join(blacklist).lower()})\\b"
-        mask2 = df['Acronym'].str.contains(kw_filter, case=False, regex=True)
-        mask = mask & ~mask2
-
-    elif blacklist == "all":  # Trick. Block all but whitelist
-        mask = False
-
-    # Filter by acronym: whitelist
-    if whitelist:
-        kw_filter = f"\\b(?:{'|'.join(whitelist).lower()})\\b"
-        mask2 = df['Acronym'].str.contains(kw_filter, case=False, regex=True)
-        mask = mask | mask2
-
-    # Apply mask
-    df = df[mask]
-    return df
-
-
-def fuzzy_matching(df, title, threshold=0.75):
-    if len(df) >= 2:
-        ratios = process.extract(title, list(df["When"]))
-        best_title, best_score = ratios[0]
-        if best_score >= threshold:
-            for i, (_, row) in enumerate(df.iterrows()):   # i starts at 1
-                if row["When"] == best_title:  # Check title
-                    return df[i:i+2], best_score
-    return None, 0.0
-
-
-def get_deadlines(title, acronym, year='f', in_time=False):
-    # year: all='a', 2021='t', 2021+='f', 2022='n'
-    results = []
-
-    # Fix acronym
-    if ' ' in acronym:
-        # print(f"[INFO]: Removing whitespace form acronym '{acronym}'...")
-        acronym = acronym.replace(' ', '')
-
-    # Get table
-    url = f"http://www.wikicfp.com/cfp/servlet/tool.search?q={urllib.parse.quote(acronym)}&year={year}"
-    tables = pd.read_html(url)
-
-    # Get table with 4 cols
-    df = None
-    for t_df in tables:
-        if len(t_df.shape) == 2 and t_df.shape[1] == 4:
-            df = t_df
-            break
-
-    # Check if there is any table
-    if df is not None:
-        # Make first row header
-        if set(df.iloc[0]) == {'Deadline', 'Event', 'Where', 'When'}:
-            new_header = df.iloc[0]  # grab the first row for the header
-            df = df[1:]  # take the data less the header row
-            df.columns = new_header  # set the header row as the df header
-
-        # Check if exist exact acronym (this year and next)
-        year = int(datetime.datetime.now().year)
-        for yr in [year, year+1]:
-            df_yr = df.loc[df['Event'] == f"{acronym} {yr}"]
-
-            # 1) Re-Check using fuzzy match
-            # 2) If there are more than one, select using fuzzy matching
-            df_yr, thrs = fuzzy_matching(df_yr, title)
-
-            # Check output correctness
-            if df_yr is not None and len(df_yr) == 2:
-                values = {"Event year": int(yr),
-                          "when": df_yr.iloc[1]["When"],
-                          "where": df_yr.iloc[1]["Where"],
-                          "deadline": df_yr.iloc[1]["Deadline"],
-                          }
-                clean_data(values)
-
-                # Add only deadlines in time
-                if in_time:
-                    try:
-                        deadline = values.get("deadline")
-                        deadline = datetime.datetime.strptime(deadline, '%Y-%m-%d').date()
-
-                        if deadline < datetime.date.today():
-                            values["deadline"] = "DUE"
-                    except (TypeError, ValueError) as e:
-                        values["deadline"] = ""
-
-                # Add values
-                results.append(values)
-
-            else:
-                print(f'No exact match has been found ({thrs}% matching): {acronym} {yr} | {title}')
-    return results
-
-
-def process_deadlines(args):
-    row, in_time = args
-
-    # if row["Acronym"] != "ECML PKDD":
-    #     continue
-
-    results = get_deadlines(title=row["Title"], acronym=row["Acronym"], in_time=in_time)
-    new_rows = []
-    if len(results) == 0:  # No results
-        d = dict(row)
-        new_rows.append(d)
-    elif len(results) > 0:  # Results
-        for r in results:
-            d = dict(list(dict(row).items()) + list(r.items()))
-            new_rows.append(d)
-    return new_rows
-
-
-def rank_normalizer(rank):
-    rank = str(rank).upper().strip()
-    coeff = {"A*": 200, "1": 200, "A": 150, "2": 150, "B": 100, "3": 100, "C": 30}
-    return coeff.get(rank, 0)
-
-
-def prettify_csv(df, show_extra):
     # Rename columns
     df = df.rename(columns={"Rank": "CORE rank"})
 
     # Add extra columns
-    df["Max rank"] = [max(rank_normalizer(r1), rank_normalizer(r2)) for r1, r2 in zip(df["GGS Class"], df["CORE rank"])]
+    df["Max rank"] = get_max_rank(df["GGS Class"], df["CORE rank"])
 
-    # Show minimal columns
+    # Show minimal columns (and the ones the output needs, e.g. the SQLite key)
     columns1 = [c for c in MINIMAL_COLUMNS if c in set(df.columns)]
+    columns1 += [c for c in keep if c in set(df.columns) and c not in columns1]
     if show_extra:
         columns2 = list(set(df.columns).difference(set(columns1)))
         columns1 = columns1 + columns2
@@ -283,125 +34,262 @@ def prettify_csv(df, show_extra):
     # Apply column sort
     df = df[columns1]
 
-    # Sort by(stable sort)
-    sort_cols = []
-    sort_cols += ["deadline", "GGS Class", "CORE rank"]
-    df = df.sort_values(by=sort_cols, ascending=True, kind="mergesort")  # Ascending
-    sort_cols = []
-    sort_cols += ["Max rank"]
-    df = df.sort_values(by=sort_cols, ascending=False, kind="mergesort")  # Descending
+    # Sort by max rank (descending), then by deadline and ranks (ascending; best first). Stable sort
+    sort_cols = ["Max rank", "deadline", "GGS Class", "CORE rank"]
+    df = df.sort_values(by=sort_cols, ascending=[False, True, True, True], kind="mergesort")
     return df
 
 
-def normalize_title(title1, title2):
-    # Normalize titles
-    title1 = title1.strip() if isinstance(title1, str) and title1.strip() not in {"", "nan", "-"} else None
-    title2 = title2.strip() if isinstance(title2, str) and title2.strip() not in {"", "nan", "-"} else None
-
-    # Select title (title1 has preference, CORE)
-    title_normalized = title2 if not title1 and title2 else title1
-    return title_normalized
-
-
-def normalize_dates(date):
-    try:
-        # Remove brackets
-        new_date = re.sub(r"\(.*\)", "", date)
+def get_prefetch_acronyms(whitelists, ignore_wikicfp=False, warm_cache=False, resume=False, refresh="full",
+                          categories=None):
+    # Whitelisted acronyms pass any filter: their lookups can start before the sources are merged and filtered
+    # In bulk mode most of them are in the call listings (one search each would undo the savings)
+    if ignore_wikicfp or warm_cache or resume or refresh != "full" or categories:
+        return None
+    return sorted({str(w).strip().upper() for whitelist in whitelists for w in (whitelist or [])})
 
-        # Parse date
-        new_date = parse(str(new_date))
 
-        # Format
-        new_date = str(new_date.date())
-        return new_date
-    except dateutil.parser.ParserError:
-        print(f"\t=>[INVALID DATE]: {date}")
-        return date
+def get_result_cache(output_file, output_format=None, cache_dir=None, use_cache=True, cache_ttl=24*3600,
+                     result_cache_size=0, force_download=False, warm_cache=False, resume=False, refresh="full"):
+    # Only complete runs that replace their output file are memoized
+    if not output_file or not use_cache or not result_cache_size or force_download or warm_cache or resume \
+            or refresh != "full" or get_output_format(output_file, output_format) not in RESULT_FORMATS:
+        return None
+    return ResultCache(get_cache_dir(cache_dir), max_age=cache_ttl, max_size=result_cache_size)
 
 
-def clean_data(data):
-    data["deadline"] = normalize_dates(data["deadline"]) if data.get("deadline") else ""
+def restore_result(result_cache, output_file, **query):
+    if result_cache is None or not result_cache.restore(get_result_key(result_cache.cache_dir, **query), output_file):
+        return False
+    print(f"File restored from the result cache! ({os.path.abspath(output_file)})")
+    return True
 
 
 def search4papers(output_file, keywords, nokeywords, whitelist, blacklist, ratings, ignore_wikicfp, ignore_ggs,
-                  in_time, force_download, show_extra, ref_source):
-    # Create cache folder if it does not exists
-    cache_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".cache"))
-    p = Path(cache_dir)
-    p.mkdir(parents=True, exist_ok=True)
-
-    # Get CORE conferences
-    df_core = get_core_conferences(force_download=force_download, cache_dir=cache_dir)
-    df_core = df_core.rename(columns={"Title": "CORE_title", "Acronym": "Acronym"})
-
-    # Normalize values
-    df_core["CORE_title"] = df_core["CORE_title"].apply(lambda x: str(x).strip())
-    df_core["Acronym"] = df_core["Acronym"].apply(lambda x: str(x).strip().upper())  # Force uppercase
-
-    # Add GGS information
-    if not ignore_ggs:
-        # Get GGS conferences
-        df_ggs = get_ggs_conferences(force_download=force_download, cache_dir=cache_dir)
-
-        # Rename columns and remove index column
-        df_ggs = df_ggs.rename(columns={"Title": "GGS_title", "Acronym": "Acronym"})
-        df_ggs = df_ggs.drop(df_ggs.columns[[0]], axis=1)
-
-        # Normalize values
-        df_ggs["GGS_title"] = df_ggs["GGS_title"].apply(lambda x: str(x).strip())
-        df_ggs["Acronym"] = df_ggs["Acronym"].apply(lambda x: str(x).strip().upper())  # Force uppercase
-
-        # Perform merge operation (JOIN)
-        how = {"core": "left", "ggs": "right", "all": "outer"}
-        df = pd.merge(df_core, df_ggs, on='Acronym', how=how.get(ref_source, "outer"))
-
-        # Create reference title
-        df["Title"] = df[['CORE_title', 'GGS_title']].apply(lambda x: normalize_title(*x), axis=1)
-
-    else:  # alias
-        df = df_core
-
-        # Create reference title
-        df["Title"] = df["CORE_title"]
+                  in_time, force_download, show_extra, ref_source, concurrency=16, timeout=10.0, retries=3,
+                  wikicfp_url=WIKICFP_URL, use_cache=True, cache_ttl=24*3600, warm_cache=False, resume=False,
+                  refresh="full", refresh_days=7, core_url=CORE_URL, ggs_url=GGS_URL, cache_dir=None, index=None,
+                  output_format=None, result_cache_size=0, categories=None, max_pages=20,
+                  wikicfp_category_url=WIKICFP_CATEGORY_URL, aliases=True, source_max_age=SOURCE_MAX_AGE,
+                  background_refresh=False, core_editions=None, trends=None):
+    # Reuse the output of an identical query (same filters, sources and WikiCFP cache). Returns None in that case
+    result_cache = get_result_cache(output_file, output_format, index.cache_dir if index is not None else cache_dir,
+                                    use_cache=use_cache, cache_ttl=cache_ttl, result_cache_size=result_cache_size,
+                                    force_download=force_download, warm_cache=warm_cache, resume=resume,
+                                    refresh=refresh)
+    query = dict(keywords=keywords, nokeywords=nokeywords, whitelist=whitelist, blacklist=blacklist, ratings=ratings,
+                 ref_source=ref_source, in_time=in_time, show_extra=show_extra, ignore_ggs=ignore_ggs,
+                 ignore_wikicfp=ignore_wikicfp, output_format=output_format, categories=categories, aliases=aliases,
+                 core_editions=core_editions, trends=trends)
+    if result_cache is not None:
+        query["output_format"] = get_output_format(output_file, output_format)
+        if restore_result(result_cache, output_file, **query):
+            return None
+
+    from call4papers.index import ConferenceIndex
+    from call4papers.schema import get_acceptance_rates
+    from call4papers.wikicfp import normalize_acronym
+    from call4papers.refresh import get_state_path, load_state, save_state, get_stale_acronyms, diff_deadlines
+
+    # Load and merge CORE and GGS (unless an index is reused)
+    if index is None:
+        index = ConferenceIndex(cache_dir=cache_dir, force_download=force_download, ref_source=ref_source,
+                                ignore_ggs=ignore_ggs, ignore_wikicfp=ignore_wikicfp, concurrency=concurrency,
+                                timeout=timeout, retries=retries, use_cache=use_cache, cache_ttl=cache_ttl,
+                                core_url=core_url, ggs_url=ggs_url, wikicfp_url=wikicfp_url, categories=categories,
+                                max_pages=max_pages, wikicfp_category_url=wikicfp_category_url, aliases=aliases,
+                                prefetch=get_prefetch_acronyms([whitelist], ignore_wikicfp=ignore_wikicfp,
+                                                               warm_cache=warm_cache, resume=resume, refresh=refresh,
+                                                               categories=categories if in_time else None),
+                                source_max_age=source_max_age, background_refresh=background_refresh,
+                                core_editions=core_editions)
+    cache_dir = index.cache_dir
 
     # Filter conferences
-    df = filter_invalid_rows(df)
-    df = filter_conferences(df, keywords=keywords, nokeywords=nokeywords,
-                            whitelist=whitelist, blacklist=blacklist, ratings=ratings)
+    if warm_cache:  # The cache is warmed with all conferences
+        df = index.df
+    else:
+        df = index.filter(keywords=keywords, nokeywords=nokeywords, whitelist=whitelist, blacklist=blacklist,
+                          ratings=ratings, trends=trends)
 
     # Add Wikicfp information
     if not ignore_wikicfp:
-        pool = mp.Pool(mp.cpu_count())
-        new_rows = pool.map(process_deadlines, [(row, in_time) for i, row in tqdm(df.iterrows(), total=len(df))])
+        # Reuse the lookups of the previous run that are still fresh
+        state_path = get_state_path(cache_dir, output_file)
+        old_events, known = {}, None
+        if refresh == "incremental":
+            old_events = load_state(state_path)
+            stale = get_stale_acronyms(df, old_events, days=refresh_days)
+            known = {k: v for k, v in old_events.items() if k not in stale}
+            print(f"Incremental refresh: {len(stale)} conferences to update")
+
+        checkpoint = get_checkpoint(cache_dir, output_file, resume=resume)
+        events = index.enrich(df["Acronym"], known=known, checkpoint=checkpoint, in_time=in_time and not warm_cache)
+        checkpoint.close()
+
+        # Failed lookups are retried by the next run (the output is not memoized)
+        if any(normalize_acronym(acronym) not in events for acronym in df["Acronym"]):
+            result_cache = None
+
+        if warm_cache:
+            checkpoint.remove()
+            print(f"WikiCFP cache warmed! ({len(df)} conferences)")
+            return
+
+        # Save state for the next incremental refresh (listing hits only have open calls: searched next time)
+        keys = {normalize_acronym(acronym) for acronym in df["Acronym"]}
+        save_state(state_path, {k: v for k, v in events.items() if k in keys and not index.is_listed(k)})
+
+        # Show changes since the previous run
+        if refresh == "incremental":
+            df_diff = diff_deadlines(df, old_events, events)
+            diff_file = os.path.splitext(output_file)[0] + ".diff.csv"
+            df_diff.to_csv(diff_file, index=False)
+            print(f"Changes saved! ({os.path.abspath(diff_file)})")
+            print(", ".join(f"{n} {change}" for change, n in df_diff["change"].value_counts().items()) or "No changes")
 
         # Create new Dataframe
-        df = pd.DataFrame(sum(new_rows, []))  # Flat list
-
-        # Force types
-        df.astype({"Event year": int}, errors='ignore')
-
-        # Clean stuff
-        if in_time:
-            df = df[~(df.deadline.isin(["DUE", "TBD", ""]) | df.deadline.isnull())]
+        df = index.join(df, in_time=in_time)
 
     # Add extra values
-    df["Acceptance Rate"] = df["Acronym"].apply(lambda x: ACCEPTANCE_RATE.get(str(x).strip().upper(), None))
+    df = df.assign(**{"Acceptance Rate": get_acceptance_rates(df["Acronym"])})
 
     # Save table
     if output_file:
         # Prettify output
-        df = prettify_csv(df, show_extra)
+        keep = SQLITE_KEY if get_output_format(output_file, output_format) == "sqlite" else ()
+        df = prettify_csv(df, show_extra, keep=keep)
 
         # Save file
-        df.to_csv(output_file, index=False)
+        with stage("save"):
+            save_output(df, output_file, output_format=output_format)
         print(f"File saved! ({os.path.abspath(output_file)})")
         print(f"{len(set(df['Acronym']))} conferences found. ({len(df)} rows)")
 
+        # Memoize the output (the WikiCFP cache may have changed during the run)
+        if result_cache is not None:
+            result_cache.store(get_result_key(result_cache.cache_dir, **query), output_file)
+
+    # The run is complete. Remove checkpoint
+    if not ignore_wikicfp:
+        checkpoint.remove()
+    return df
+
+
+def get_setup_output_file(output_file, name):
+    # conferences.csv => conferences_nlp.csv
+    root, ext = os.path.splitext(output_file)
+    return f"{root}_{name}{ext}"
+
+
+def load_setups(filename, output_format=None):
+    # JSON file: {"name": {"setup": "nlp", "keywords": [...], ..., "output_file": "nlp.csv"}}
+    # "setup" (optional) takes the defaults from DEFAULT_SETUPS, and the explicit values override them
+    with open(filename, 'r', encoding="utf-8") as f:
+        config = json.load(f)
+
+    setups = {}
+    for name, values in config.items():
+        base = values.get("setup")
+        if base and base not in DEFAULT_SETUPS:
+            raise ValueError(f"Unknown setup '{base}' in '{name}'. Choices: {', '.join(DEFAULT_SETUPS.keys())}")
+
+        setup = {}
+        for key in ["keywords", "nokeywords", "whitelist", "blacklist", "ratings"]:
+            if key in values:
+                setup[key] = values[key] if values[key] == "all" else set(values[key])
+            else:
+                setup[key] = DEFAULT_SETUPS[base][key] if base else {}
+        if values.get("output_file"):
+            get_output_format(values["output_file"], output_format)  # Check format
+            setup["output_file"] = values["output_file"]
+        setups[name] = setup
+    return setups
+
+
+def batch_search4papers(setups, output_file, ignore_wikicfp, ignore_ggs, force_download, ref_source, concurrency=16,
+                        timeout=10.0, retries=3, wikicfp_url=WIKICFP_URL, use_cache=True, cache_ttl=24*3600,
+                        resume=False, refresh="full", core_url=CORE_URL, ggs_url=GGS_URL, cache_dir=None,
+                        categories=None, max_pages=20, wikicfp_category_url=WIKICFP_CATEGORY_URL, aliases=True,
+                        source_max_age=SOURCE_MAX_AGE, background_refresh=False, core_editions=None, trends=None,
+                        **kwargs):
+    # setups: {name: {keywords, nokeywords, whitelist, blacklist, ratings[, output_file]}}
+    # The sources are loaded once, and each WikiCFP lookup is done once for all setups
+    setups = {name: dict(setup, output_file=setup.get("output_file") or get_setup_output_file(output_file, name))
+              for name, setup in setups.items()}
+
+    # Outputs restored from the result cache need neither the sources nor WikiCFP
+    output_format = kwargs.get("output_format")
+    result_cache = get_result_cache(output_file, output_format, cache_dir, use_cache=use_cache, cache_ttl=cache_ttl,
+                                    result_cache_size=kwargs.get("result_cache_size", 0),
+                                    force_download=force_download, resume=resume, refresh=refresh)
+    if result_cache is not None:
+        pending = {}
+        for name, setup in setups.items():
+            query = {k: v for k, v in setup.items() if k != "output_file"}
+            if not restore_result(result_cache, setup["output_file"], ref_source=ref_source, in_time=kwargs["in_time"],
+                                  show_extra=kwargs["show_extra"], ignore_ggs=ignore_ggs, ignore_wikicfp=ignore_wikicfp,
+                                  output_format=get_output_format(setup["output_file"], output_format),
+                                  categories=categories, aliases=aliases, core_editions=core_editions, trends=trends,
+                                  **query):
+                pending[name] = setup
+        setups = pending
+        if not setups:
+            return {}
+
+    import pandas as pd
+    from call4papers.index import ConferenceIndex
+
+    index = ConferenceIndex(cache_dir=cache_dir, force_download=force_download, ref_source=ref_source,
+                            ignore_ggs=ignore_ggs, ignore_wikicfp=ignore_wikicfp, concurrency=concurrency,
+                            timeout=timeout, retries=retries, use_cache=use_cache, cache_ttl=cache_ttl,
+                            core_url=core_url, ggs_url=ggs_url, wikicfp_url=wikicfp_url, categories=categories,
+                            max_pages=max_pages, wikicfp_category_url=wikicfp_category_url, aliases=aliases,
+                            prefetch=get_prefetch_acronyms([setup.get("whitelist") for setup in setups.values()],
+                                                           ignore_wikicfp=ignore_wikicfp, resume=resume,
+                                                           refresh=refresh,
+                                                           categories=categories if kwargs["in_time"] else None),
+                            source_max_age=source_max_age, background_refresh=background_refresh,
+                            core_editions=core_editions)
+
+    # Look up the union of acronyms at once (the incremental refresh depends on the state of each output)
+    if not ignore_wikicfp and refresh == "full":
+        filters = [{k: v for k, v in setup.items() if k != "output_file"} for setup in setups.values()]
+        acronyms = pd.concat([index.filter(**f, trends=trends)["Acronym"] for f in filters]).drop_duplicates()
+        print(f"Batch: {len(setups)} setups, {len(acronyms)} unique conferences")
+
+        checkpoint = get_checkpoint(index.cache_dir, output_file, resume=resume)
+        index.enrich(acronyms, checkpoint=checkpoint, in_time=kwargs["in_time"])
+        checkpoint.close()
+
+    # Write one output per setup (the lookups are memoized by the index)
+    results = {}
+    for name, setup in setups.items():
+        setup = dict(setup)
+        setup_output_file = setup.pop("output_file")
+        print(f"[{name.upper()}]")
+        results[name] = search4papers(output_file=setup_output_file, ignore_wikicfp=ignore_wikicfp,
+                                      ignore_ggs=ignore_ggs, force_download=force_download, ref_source=ref_source,
+                                      resume=resume, refresh=refresh, index=index, categories=categories, aliases=aliases,
+                                      core_editions=core_editions, trends=trends, **setup, **kwargs)
+
+    if not ignore_wikicfp and refresh == "full":
+        checkpoint.remove()
+    return results
+
 
 def main():
+    # Subcommand: call4papers serve [...]
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from call4papers.server import main as serve_main
+        serve_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description='Process some integers.')
-    parser.add_argument('--setup', type=str, default=None, choices=list(DEFAULT_SETUPS.keys()), help='Collection of default setups')
-    parser.add_argument('--output-file', type=str, default="conferences.csv", help='Output file')
+    parser.add_argument('--setup', type=str, default=None, nargs="+", choices=list(DEFAULT_SETUPS.keys()), help='Collection of default setups (several setups are run as a batch, one output per setup)')
+    parser.add_argument('--config', type=str, default=None, help='JSON file with the setups to run as a batch (one output per setup)')
+    parser.add_argument('--output-file', type=str, default="conferences.csv", help='Output file (.csv, .parquet, .jsonl, .sqlite)')
+    parser.add_argument('--format', type=str, default=None, choices=sorted(set(OUTPUT_FORMATS.values())), help='Output format (by default, from the file extension)')
     parser.add_argument('--keywords', type=str, default=None, help='List of words to look for. Comma-separated.')
     parser.add_argument('--nokeywords', type=str, default=None, help='List of words to exclude. Comma-separated.')
     parser.add_argument('--whitelist', type=str, default=None, help='List of words (conf. acronyms). Comma-separated.')
@@ -411,48 +299,132 @@ def main():
     parser.add_argument('--show-extra', action='store_true', help='Show extra columns')
     parser.add_argument('--ref-source', type=str, default="all", choices=["core", "ggs", "all"], help='Reference source for the LEFT JOIN (all=outer join)')
     parser.add_argument('--in-time', action='store_true', help='Show only conferences where the deadline has not passed')
+    parser.add_argument('--no-aliases', action='store_true', help='Join CORE and GGS on exact acronyms only (no fuzzy matches)')
+    parser.add_argument('--core-history', action='store_true', help='Add the CORE rank history (past editions are downloaded once and stored)')
+    parser.add_argument('--core-editions', type=str, default=None, help=f'Past CORE editions of the history. Comma-separated. (implies --core-history; default: {",".join(CORE_EDITIONS)})')
+    parser.add_argument('--core-trend', type=str, default=None, help=f'Show only conferences with these CORE rank trends ({",".join(RANK_TRENDS)}). Comma-separated. (implies --core-history)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Maximum number of concurrent WikiCFP requests')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Timeout (in seconds) for each WikiCFP request')
+    parser.add_argument('--retries', type=int, default=3, help='Number of retries (with backoff) for each WikiCFP request')
+    parser.add_argument('--cache-ttl', type=float, default=24, help='Time-to-live (in hours) of the cached WikiCFP responses')
+    parser.add_argument('--source-max-age', type=float, default=SOURCE_MAX_AGE / 3600, help='Hours before the cached CORE and GGS files are revalidated (conditional requests)')
+    parser.add_argument('--background-refresh', action='store_true', help='Use stale CORE and GGS files and revalidate them in the background (for the next run)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read nor write the WikiCFP cache')
+    parser.add_argument('--purge-cache', action='store_true', help='Remove all cached WikiCFP responses and results, and exit')
+    parser.add_argument('--result-cache-size', type=float, default=100, help='Maximum size (in MB) of the cached results of previous queries (0 to disable)')
+    parser.add_argument('--cache-dir', type=str, default=None, help='Cache folder (default: call4papers/.cache)')
+    parser.add_argument('--bulk', action='store_true', help='Resolve most conferences from the WikiCFP call listings (one request per page), and search only the rest (requires --in-time)')
+    parser.add_argument('--categories', type=str, default=None, help='WikiCFP categories crawled in bulk mode. Comma-separated. (implies --bulk)')
+    parser.add_argument('--max-pages', type=int, default=20, help='Maximum number of listing pages per category (bulk mode)')
+    parser.add_argument('--resume', action='store_true', help='Resume the WikiCFP lookups of an interrupted run')
+    parser.add_argument('--refresh', type=str, default="full", choices=["full", "incremental"], help='Re-query all conferences or only the stale ones (new, missing or close deadlines)')
+    parser.add_argument('--refresh-days', type=int, default=7, help='Deadlines within these days are re-queried in incremental mode')
+    parser.add_argument('--profile', type=str, default=None, help='Save a JSON report with the time of each stage and the counters (requests, cache hits,...)')
+    parser.add_argument('--cprofile', type=str, default=None, help='Save the cProfile stats of the run (pstats format)')
+    parser.add_argument('--warm-cache', action='store_true', help='Cache the WikiCFP responses of all conferences (no filters) and exit')
 
     # Pars vars
     args = parser.parse_args()
 
+    # Purge cache
+    if args.purge_cache:
+        cache_dir = get_cache_dir(args.cache_dir)
+        cache = get_wikicfp_cache(cache_dir)
+        print(f"WikiCFP cache purged! ({cache.purge()} entries removed)")
+        print(f"Result cache purged! ({ResultCache(cache_dir).purge()} results removed)")
+        cache.close()
+        return
+
     # Check output file
-    if not args.output_file.endswith(".csv"):
-        raise ValueError("The output file must end with '.csv'")
+    get_output_format(args.output_file, args.format)
 
     # Check if the output file exists
     if os.path.isfile(args.output_file):
-        print("The file already exists. It will be overwritten")
+        if get_output_format(args.output_file, args.format) == "sqlite":
+            print("The database already exists. The conferences will be updated")
+        else:
+            print("The file already exists. It will be overwritten")
 
     # Default vars
-    if args.setup:
-        keywords = DEFAULT_SETUPS[args.setup]["keywords"]
-        nokeywords = DEFAULT_SETUPS[args.setup]["nokeywords"]
-        whitelist = DEFAULT_SETUPS[args.setup]["whitelist"]
-        blacklist = DEFAULT_SETUPS[args.setup]["blacklist"]
-        ratings = DEFAULT_SETUPS[args.setup]["ratings"]
+    if args.config:
+        setups = load_setups(args.config, output_format=args.format)
+    elif args.setup:
+        setups = {name: dict(DEFAULT_SETUPS[name]) for name in dict.fromkeys(args.setup)}
     else:
-        keywords = {} if args.keywords is None else set(args.keywords.split(","))
-        nokeywords = {} if args.nokeywords is None else set(args.nokeywords.split(","))
-        whitelist = {} if args.whitelist is None else set(args.whitelist.split(","))
-        blacklist = {} if args.blacklist is None else set(args.blacklist.split(","))
-        ratings = {} if args.ratings is None else set(args.ratings.split(","))
+        setups = {"custom": {
+            "keywords": {} if args.keywords is None else set(args.keywords.split(",")),
+            "nokeywords": {} if args.nokeywords is None else set(args.nokeywords.split(",")),
+            "whitelist": {} if args.whitelist is None else set(args.whitelist.split(",")),
+            "blacklist": {} if args.blacklist is None else set(args.blacklist.split(",")),
+            "ratings": {} if args.ratings is None else set(args.ratings.split(",")),
+        }}
+
+    # Bulk mode
+    categories = None
+    if args.categories:
+        categories = [c.strip() for c in args.categories.split(",") if c.strip()]
+    elif args.bulk:
+        categories = WIKICFP_CATEGORIES
+    if categories and not args.in_time:  # The listings only have open calls (past editions would be missing)
+        print("\t=>[WARNING]: Bulk mode requires '--in-time'. The conferences will be searched one by one")
+        categories = None
+
+    # CORE rank history
+    core_editions, trends = None, None
+    if args.core_trend:
+        trends = {t.strip().lower() for t in args.core_trend.split(",") if t.strip()}
+        if trends.difference(RANK_TRENDS):
+            parser.error(f"Invalid trends: {', '.join(sorted(trends.difference(RANK_TRENDS)))}. Choices: {', '.join(RANK_TRENDS)}")
+    if args.core_editions:
+        core_editions = [e.strip().upper() for e in args.core_editions.split(",") if e.strip()]
+    elif args.core_history or trends:
+        core_editions = CORE_EDITIONS
 
     # Show vars
+    for name, setup in setups.items():
+        print("-"*80)
+        print(f"- Setup: {name.upper() if (args.setup or args.config) else 'None' }")
+        print(f"- Keywords: {', '.join(sorted(list(setup['keywords']))).lower()}")
+        print(f"- Exclusion keywords: {', '.join(sorted(list(setup['nokeywords']))).lower()}")
+        print(f"- Whitelist (Acronyms): {', '.join(sorted(list(setup['whitelist']))).upper()}")
+        print(f"- Blacklist (Acronyms): {', '.join(sorted(list(setup['blacklist']))).upper()}")
+        print(f"- Ratings: {', '.join(sorted(list(setup['ratings']))).upper()}")
+        if trends:
+            print(f"- CORE trends: {', '.join(sorted(trends))}")
     print("-"*80)
-    print(f"- Setup: {args.setup.upper() if args.setup else 'None' }")
-    print(f"- Keywords: {', '.join(sorted(list(keywords))).lower()}")
-    print(f"- Exclusion keywords: {', '.join(sorted(list(nokeywords))).lower()}")
-    print(f"- Whitelist (Acronyms): {', '.join(sorted(list(whitelist))).upper()}")
-    print(f"- Blacklist (Acronyms): {', '.join(sorted(list(blacklist))).upper()}")
-    print(f"- Ratings: {', '.join(sorted(list(ratings))).upper()}")
-    print("-"*80)
+
+    # Profile the whole run (optional)
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler is not None:
+        profiler.enable()
 
     # Run
-    search4papers(force_download=args.force_download, output_file=args.output_file,
-                  keywords=keywords, nokeywords=nokeywords, whitelist=whitelist, blacklist=blacklist, ratings=ratings,
-                  ignore_wikicfp=False, ignore_ggs=False,
-                  in_time=args.in_time, show_extra=args.show_extra, ref_source=args.ref_source,
-                  )
+    run_args = dict(force_download=args.force_download, ignore_wikicfp=False, ignore_ggs=False,
+                    in_time=args.in_time, show_extra=args.show_extra, ref_source=args.ref_source,
+                    concurrency=args.concurrency, timeout=args.timeout, retries=args.retries,
+                    use_cache=not args.no_cache, cache_ttl=args.cache_ttl*3600,
+                    resume=args.resume, refresh=args.refresh, refresh_days=args.refresh_days, output_format=args.format,
+                    result_cache_size=int(args.result_cache_size * 2**20), cache_dir=args.cache_dir,
+                    categories=categories, max_pages=args.max_pages, aliases=not args.no_aliases,
+                    source_max_age=args.source_max_age*3600, background_refresh=args.background_refresh,
+                    core_editions=core_editions, trends=trends)
+    with stage("total"):
+        if len(setups) > 1 and not args.warm_cache:
+            batch_search4papers(setups, output_file=args.output_file, **run_args)
+        else:
+            setup = dict(next(iter(setups.values())))
+            output_file = setup.pop("output_file", None) or args.output_file
+            search4papers(output_file=output_file, warm_cache=args.warm_cache, **setup, **run_args)
+
+    # Save reports
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print(f"cProfile stats saved! ({os.path.abspath(args.cprofile)})")
+
+    if args.profile:
+        PROFILER.save(args.profile)
+        print(f"Profile saved! ({os.path.abspath(args.profile)})")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process, utils
+
+from call4papers.profiling import stage, count
+
+MATCH_THRESHOLD = 75  # Minimum WRatio score (0-100) of an event title
+
+
+def score_pairs(queries, choices):
+    # Score every (query, choice) pair in one vectorized call (0-100)
+    if len(queries) == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    count("fuzzy_match_calls")
+    count("fuzzy_match_pairs", len(queries))
+    with stage("fuzzy_matching"):
+        return process.cpdist(queries, choices, scorer=fuzz.WRatio, processor=utils.default_process, workers=-1)
+
+
+def match_candidates(candidates, threshold=MATCH_THRESHOLD):
+    # candidates: one row per (key, year, event) with the conference title ("query") and the event title ("choice")
+    # Returns the best candidate per (key, year) above the threshold, along with its score
+    if len(candidates) == 0:
+        return candidates.assign(score=pd.Series(dtype=np.float32))
+
+    candidates = candidates.assign(score=score_pairs(list(candidates["query"]), list(candidates["choice"])))
+    candidates = candidates[candidates["score"] >= threshold]
+
+    # First candidate wins on ties (same as process.extract)
+    best_idx = candidates.groupby(["key", "year"], sort=False)["score"].idxmax()
+    return candidates.loc[best_idx.values]
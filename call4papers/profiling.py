@@ -0,0 +1,72 @@
+import json
+import time
+import datetime
+import threading
+import functools
+from collections import Counter
+from contextlib import contextmanager
+
+
+class Profiler:
+    # Wall time per pipeline stage and counters (requests, cache hits, ...) shared by all threads
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.timers = {}
+            self.counters = Counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, elapsed):
+        with self._lock:
+            timer = self.timers.setdefault(name, {"time": 0.0, "calls": 0})
+            timer["time"] += elapsed
+            timer["calls"] += 1
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def report(self):
+        with self._lock:
+            return {"created": datetime.datetime.now().isoformat(),
+                    "stages": {k: dict(v) for k, v in self.timers.items()},
+                    "counters": dict(self.counters)}
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+# Default profiler (always on: timers and counters are cheap)
+PROFILER = Profiler()
+
+
+def stage(name):
+    return PROFILER.stage(name)
+
+
+def count(name, n=1):
+    PROFILER.count(name, n)
+
+
+def timed(name):
+    # Decorator to time every call of a pipeline stage
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with PROFILER.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
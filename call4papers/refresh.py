@@ -0,0 +1,85 @@
+import os
+import json
+import datetime
+
+import pandas as pd
+
+from call4papers.cache import get_run_id
+from call4papers.wikicfp import normalize_acronym, resolve_deadlines
+from call4papers.dates import parse_dates
+
+DIFF_COLUMNS = ["Acronym", "Title", "Event year", "change", "old deadline", "deadline", "old when", "when"]
+
+
+def get_state_path(cache_dir, output_file):
+    return os.path.join(cache_dir, f"state_{get_run_id(output_file)}.json")
+
+
+def load_state(path):
+    # Parsed WikiCFP events per acronym from the previous run
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)["events"]
+
+
+def save_state(path, events):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({"updated": datetime.datetime.now().isoformat(), "events": events}, f)
+    os.replace(tmp_path, path)
+
+
+def resolve_rows(df, events):
+    conferences = list(zip(df["Title"], df["Acronym"]))
+    results = resolve_deadlines(conferences, [events.get(normalize_acronym(a), []) for _, a in conferences],
+                                verbose=False)
+
+    # Parse all the deadlines at once (date or None)
+    values = [v for r in results for v in r]
+    deadlines = parse_dates([v["deadline"] for v in values], verbose=False)
+    for v, deadline in zip(values, deadlines):
+        v["deadline"] = None if pd.isnull(deadline) else deadline.date()
+    return conferences, results
+
+
+def get_stale_acronyms(df, events, days=7):
+    # New conferences, missing deadlines, and deadlines that are past or within N days need a new lookup
+    limit = datetime.date.today() + datetime.timedelta(days=days)
+    conferences, results = resolve_rows(df, events)
+
+    stale = set()
+    for (title, acronym), values in zip(conferences, results):
+        key = normalize_acronym(acronym)
+        deadlines = [v["deadline"] for v in values]
+        if key not in events or not any(d is not None and d > limit for d in deadlines):
+            stale.add(key)
+    return stale
+
+
+def diff_deadlines(df, old_events, new_events):
+    _, old_results = resolve_rows(df, old_events)
+    conferences, new_results = resolve_rows(df, new_events)
+
+    rows = []
+    for (title, acronym), old_values, new_values in zip(conferences, old_results, new_results):
+        old_values = {v["Event year"]: v for v in old_values}
+
+        # New venue
+        if normalize_acronym(acronym) not in old_events:
+            for v in new_values:
+                rows.append([acronym, title, v["Event year"], "new venue", None, v["deadline"], None, v["when"]])
+            continue
+
+        for v in new_values:
+            old = old_values.get(v["Event year"])
+            if old is None or (not old["deadline"] and v["deadline"]):  # New deadline
+                rows.append([acronym, title, v["Event year"], "new deadline", old["deadline"] if old else None,
+                             v["deadline"], old["when"] if old else None, v["when"]])
+            elif old["deadline"] != v["deadline"] or old["when"] != v["when"]:  # Moved dates
+                rows.append([acronym, title, v["Event year"], "moved", old["deadline"], v["deadline"],
+                             old["when"], v["when"]])
+
+    df_diff = pd.DataFrame(rows, columns=DIFF_COLUMNS)
+    df_diff = df_diff.drop_duplicates(subset=["Acronym", "Event year", "change"])
+    return df_diff
@@ -0,0 +1,182 @@
+import os
+import re
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from call4papers.profiling import timed, stage, count
+
+RESOLUTION_VERSION = 1  # Bump when the scores change for the same inputs
+ALIAS_COLUMNS = ["CORE_acronym", "GGS_acronym", "CORE_title", "GGS_title", "title_score", "acronym_score", "score",
+                 "status"]
+ALIAS_STATUS = {"auto", "review", "accepted", "rejected"}  # auto/accepted are merged. Edit "status" to review them
+STOPWORDS = {"a", "an", "and", "annual", "conference", "for", "in", "international", "of", "on", "symposium", "the"}
+NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(title):
+    # "The 5th International Conference on Learning Representations" => "5th learning representations"
+    words = NON_ALPHANUMERIC.sub(" ", str(title).lower()).split()
+    return " ".join(w for w in words if w not in STOPWORDS)
+
+
+def get_block_keys(acronym, name):
+    # Title words and acronym trigrams ("#NIPS#" and "#NEURIPS#" share "IPS" and "PS#")
+    padded = f"#{acronym}#"
+    keys = {f"w:{w}" for w in name.split() if len(w) > 2}
+    keys.update(f"a:{padded[i:i+3]}" for i in range(len(padded) - 2))
+    return keys
+
+
+def get_blocks(df, title_column):
+    # One row per (row, key)
+    names = df[title_column].map(normalize_name)
+    rows = [(i, key) for i, acronym, name in zip(df.index, df["Acronym"], names) for key in get_block_keys(acronym, name)]
+    return pd.DataFrame(rows, columns=["row", "key"]), names
+
+
+def get_candidate_pairs(df_core, df_ggs, max_block=50):
+    # Rows that share a key (blocking). Common keys ("learning", "#IC"...) are ignored, so the pairs stay linear
+    blocks_core, names_core = get_blocks(df_core, "CORE_title")
+    blocks_ggs, names_ggs = get_blocks(df_ggs, "GGS_title")
+    sizes = blocks_core["key"].value_counts().add(blocks_ggs["key"].value_counts(), fill_value=0)
+    keys = sizes.index[sizes <= max_block]
+
+    pairs = pd.merge(blocks_core[blocks_core["key"].isin(keys)], blocks_ggs[blocks_ggs["key"].isin(keys)],
+                     on="key", suffixes=("_core", "_ggs"))
+    pairs = pairs[["row_core", "row_ggs"]].drop_duplicates().reset_index(drop=True)
+    return pairs.assign(CORE_acronym=df_core.loc[pairs["row_core"], "Acronym"].to_numpy(),
+                        GGS_acronym=df_ggs.loc[pairs["row_ggs"], "Acronym"].to_numpy(),
+                        CORE_title=df_core.loc[pairs["row_core"], "CORE_title"].to_numpy(),
+                        GGS_title=df_ggs.loc[pairs["row_ggs"], "GGS_title"].to_numpy(),
+                        name_core=names_core.loc[pairs["row_core"]].to_numpy(),
+                        name_ggs=names_ggs.loc[pairs["row_ggs"]].to_numpy())
+
+
+def score_candidates(pairs, title_weight=0.7):
+    # Score all the pairs in two vectorized calls (0-100)
+    if len(pairs) == 0:
+        return pairs.assign(title_score=0.0, acronym_score=0.0, score=0.0)
+
+    count("resolution_pairs", len(pairs))
+    with stage("fuzzy_matching"):
+        title_score = process.cpdist(list(pairs["name_core"]), list(pairs["name_ggs"]), scorer=fuzz.ratio,
+                                     workers=-1)  # Word order matters ("Data Vision Theory" != "Vision Theory Data")
+        acronym_score = process.cpdist(list(pairs["CORE_acronym"]), list(pairs["GGS_acronym"]),
+                                       scorer=fuzz.partial_ratio, workers=-1)  # "ECML" in "ECMLPKDD" => 100
+    title_score, acronym_score = title_score.astype(np.float64), acronym_score.astype(np.float64)
+    score = title_weight * title_score + (1 - title_weight) * acronym_score
+    return pairs.assign(title_score=np.round(title_score, 1), acronym_score=np.round(acronym_score, 1),
+                        score=np.round(score, 1))
+
+
+def assign_pairs(pairs, taken_core=(), taken_ggs=()):
+    # One to one: best scores first (each acronym is used once)
+    taken_core, taken_ggs = set(taken_core), set(taken_ggs)
+    keep = []
+    for i, acr_core, acr_ggs in zip(pairs.index, pairs["CORE_acronym"], pairs["GGS_acronym"]):
+        if acr_core not in taken_core and acr_ggs not in taken_ggs:
+            taken_core.add(acr_core)
+            taken_ggs.add(acr_ggs)
+            keep.append(i)
+    return pairs.loc[keep]
+
+
+@timed("resolve")
+def find_aliases(df_core, df_ggs, threshold=85, review_margin=10, reviewed=None):
+    # Only the acronyms that the exact join leaves unmatched on both sides
+    acronyms_core, acronyms_ggs = set(df_core["Acronym"]), set(df_ggs["Acronym"])
+    df_core = df_core[~df_core["Acronym"].isin(acronyms_ggs)].drop_duplicates("Acronym")
+    df_ggs = df_ggs[~df_ggs["Acronym"].isin(acronyms_core)].drop_duplicates("Acronym")
+
+    pairs = score_candidates(get_candidate_pairs(df_core, df_ggs))
+    pairs = pairs[pairs["score"] >= threshold - review_margin]
+    pairs = pairs.sort_values(["score", "CORE_acronym", "GGS_acronym"], ascending=[False, True, True],
+                              kind="mergesort")
+
+    # Reviewed pairs win: accepted acronyms are taken, and rejected pairs are never proposed again
+    reviewed = reviewed if reviewed is not None else pd.DataFrame(columns=ALIAS_COLUMNS, dtype=object)
+    rejected = set(zip(*[reviewed.loc[reviewed["status"] == "rejected", c] for c in ["CORE_acronym", "GGS_acronym"]]))
+    accepted = reviewed[reviewed["status"] == "accepted"]
+    pairs = pairs[[p not in rejected for p in zip(pairs["CORE_acronym"], pairs["GGS_acronym"])]]
+    pairs = assign_pairs(pairs, taken_core=accepted["CORE_acronym"], taken_ggs=accepted["GGS_acronym"])
+
+    pairs = pairs.assign(status=np.where(pairs["score"] >= threshold, "auto", "review"))
+    aliases = pd.concat([reviewed, pairs[ALIAS_COLUMNS]], ignore_index=True) if len(reviewed) \
+        else pairs[ALIAS_COLUMNS].reset_index(drop=True)
+    count("resolution_aliases", int((aliases["status"].isin({"auto", "accepted"})).sum()))
+    return aliases
+
+
+def get_aliases_key(df_core, df_ggs, threshold):
+    # Hash of the inputs of the resolution (the aliases are recomputed when CORE or GGS change)
+    h = hashlib.sha256(json.dumps({"version": RESOLUTION_VERSION, "threshold": threshold}).encode("utf-8"))
+    for df, column in [(df_core, "CORE_title"), (df_ggs, "GGS_title")]:
+        h.update(pd.util.hash_pandas_object(df[["Acronym", column]].astype(str), index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def load_aliases(filename):
+    if not os.path.exists(filename):
+        return None, None
+
+    key = None
+    if os.path.exists(filename + ".key"):
+        with open(filename + ".key", 'r') as f:
+            key = f.read().strip()
+
+    aliases = pd.read_csv(filename, dtype={"CORE_acronym": str, "GGS_acronym": str, "status": str})
+    aliases["status"] = aliases["status"].fillna("auto").str.strip().str.lower()
+
+    invalid = set(aliases["status"]).difference(ALIAS_STATUS)
+    if invalid:
+        print(f"\t=>[ERROR]: Invalid alias status: {', '.join(sorted(invalid))} (valid: {', '.join(sorted(ALIAS_STATUS))})")
+        aliases = aliases[aliases["status"].isin(ALIAS_STATUS)]
+    return aliases[ALIAS_COLUMNS], key
+
+
+def save_aliases(filename, aliases, key):
+    # Write atomically (the table is meant to be reviewed by hand: the key goes to a sidecar file)
+    tmp_path = filename + ".tmp"
+    aliases.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, filename)
+    with open(filename + ".key", 'w') as f:
+        f.write(key)
+
+
+def resolve_aliases(df_core, df_ggs, filename, threshold=85, force=False):
+    # Cached alias table: reused while CORE and GGS do not change. Reviewed rows are kept across runs
+    key = get_aliases_key(df_core, df_ggs, threshold)
+    aliases, cached_key = load_aliases(filename)
+    if aliases is not None and not force and cached_key == key:
+        count("resolution_cache_hits")
+        return aliases
+
+    reviewed = aliases[aliases["status"].isin({"accepted", "rejected"})] if aliases is not None else None
+    aliases = find_aliases(df_core, df_ggs, threshold=threshold, reviewed=reviewed)
+    save_aliases(filename, aliases, key)
+
+    merged = aliases["status"].isin({"auto", "accepted"}).sum()
+    print(f"Aliases resolved! ({merged} merged, {(aliases['status'] == 'review').sum()} to review) "
+          f"({os.path.abspath(filename)})")
+    return aliases
+
+
+def apply_aliases(df_core, df_ggs, aliases, ref_source="all"):
+    # Rename the acronyms of one source to those of the other (the reference), so the join merges them
+    # Pairs that the exact join already matches (e.g. reviewed before the sources changed) are skipped
+    aliases = aliases[aliases["status"].isin({"auto", "accepted"})
+                      & ~aliases["CORE_acronym"].isin(set(df_ggs["Acronym"]))
+                      & ~aliases["GGS_acronym"].isin(set(df_core["Acronym"]))]
+    if ref_source == "ggs":
+        mapping = dict(zip(aliases["CORE_acronym"], aliases["GGS_acronym"]))
+        df_core = df_core.assign(Alias=df_core["Acronym"].where(df_core["Acronym"].isin(mapping.keys())),
+                                 Acronym=df_core["Acronym"].replace(mapping))
+    else:
+        mapping = dict(zip(aliases["GGS_acronym"], aliases["CORE_acronym"]))
+        df_ggs = df_ggs.assign(Alias=df_ggs["Acronym"].where(df_ggs["Acronym"].isin(mapping.keys())),
+                               Acronym=df_ggs["Acronym"].replace(mapping))
+    return df_core, df_ggs
@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import datetime
+
+from call4papers.cache import file_hash, get_core_filename, get_ggs_filename, get_wikicfp_cache, get_aliases_filename, \
+    get_rank_history
+from call4papers.profiling import count
+
+RESULTS_VERSION = 2  # Bump when the output changes for the same inputs
+RESULT_FORMATS = {"csv", "parquet", "jsonl"}  # SQLite outputs are updated in place (not replaced)
+
+
+def normalize_words(words, upper=False):
+    # Same semantics as the filters: case-insensitive sets
+    if words == "all":
+        return words
+    return sorted({str(w).upper() if upper else str(w).lower() for w in (words or [])})
+
+
+def get_result_key(cache_dir, keywords, nokeywords, whitelist, blacklist, ratings, ref_source, in_time, show_extra,
+                   ignore_ggs, ignore_wikicfp, output_format, categories=None, aliases=True, core_editions=None,
+                   trends=None):
+    # Hash of the query and of the versions of its inputs. None if the sources have not been downloaded yet
+    core_file, _ = get_core_filename(cache_dir)
+    ggs_file = get_ggs_filename(cache_dir)
+    if not os.path.exists(core_file) or (not ignore_ggs and not os.path.exists(ggs_file)):
+        return None
+
+    generation = None
+    if not ignore_wikicfp:
+        cache = get_wikicfp_cache(cache_dir)
+        generation = cache.generation()
+        cache.close()
+
+    # The alias table can be edited by hand
+    aliases_file = get_aliases_filename(cache_dir)
+    aliases_hash = file_hash(aliases_file) if aliases and not ignore_ggs and os.path.exists(aliases_file) else None
+
+    # Past CORE editions do not change, but the ones that could not be downloaded yet are missing
+    editions = None
+    if core_editions is not None:
+        history = get_rank_history(cache_dir)
+        editions = sorted(history.editions().intersection(core_editions))
+        history.close()
+
+    today = datetime.date.today()
+    params = {"version": RESULTS_VERSION,
+              "keywords": normalize_words(keywords),
+              "nokeywords": normalize_words(nokeywords),
+              "whitelist": normalize_words(whitelist),
+              "blacklist": normalize_words(blacklist),
+              "ratings": normalize_words(ratings, upper=True),
+              "ref_source": ref_source, "in_time": bool(in_time), "show_extra": bool(show_extra),
+              "ignore_ggs": bool(ignore_ggs), "ignore_wikicfp": bool(ignore_wikicfp), "format": output_format,
+              "date": today.isoformat() if in_time else today.year,  # Deadlines in time / event years matched
+              "core": file_hash(core_file),
+              "ggs": None if ignore_ggs else file_hash(ggs_file),
+              "wikicfp": generation,
+              "categories": sorted(categories) if categories and in_time else None,  # Bulk mode (in time only)
+              "aliases": bool(aliases) and not ignore_ggs, "aliases_file": aliases_hash,
+              "core_editions": editions, "trends": normalize_words(trends),  # Rank history
+              }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    # Outputs of previous queries (one file per key), evicted by age and by total size (oldest first)
+
+    def __init__(self, cache_dir, max_age=24 * 3600, max_size=100 * 2**20):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, "results")
+        self.max_age = max_age  # Seconds. None means no expiration
+        self.max_size = max_size  # Bytes
+        os.makedirs(self.path, exist_ok=True)
+
+    def get_path(self, key):
+        return os.path.join(self.path, key)
+
+    def is_expired(self, path):
+        return self.max_age is not None and time.time() - os.path.getmtime(path) > self.max_age
+
+    def restore(self, key, output_file):
+        # Copy the stored output. False if there is none (or it is too old)
+        path = self.get_path(key) if key else None
+        if path is None or not os.path.exists(path) or self.is_expired(path):
+            count("result_cache_misses")
+            return False
+
+        shutil.copyfile(path, output_file)
+        count("result_cache_hits")
+        return True
+
+    def store(self, key, output_file):
+        if not key:
+            return
+
+        # Write atomically
+        path = self.get_path(key)
+        tmp_path = path + ".tmp"
+        shutil.copyfile(output_file, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.path):
+            path = os.path.join(self.path, name)
+            if name.endswith(".tmp"):
+                continue
+            entries.append((os.path.getmtime(path), os.path.getsize(path), path))
+
+        # Remove expired entries, and then the oldest ones until the cache fits
+        removed = 0
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if self.is_expired(path) or total > self.max_size:
+                os.remove(path)
+                total -= size
+                removed += 1
+        return removed
+
+    def purge(self):
+        names = os.listdir(self.path)
+        for name in names:
+            os.remove(os.path.join(self.path, name))
+        return len(names)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from call4papers.constants import ACCEPTANCE_RATE, CORE_RANKS, GGS_CLASSES, RANK_SCORES
+
+
+def normalize_label(value):
+    # 1, 1.0 and "1 " are the same class
+    if pd.isnull(value):
+        return None
+    if isinstance(value, (int, float, np.number)) and float(value).is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def to_ordered_category(series, known):
+    # Best first (known order), then the other values (alphabetically)
+    labels = series.map(normalize_label, na_action="ignore")
+    others = sorted(set(labels.dropna()).difference(known))
+    return pd.Categorical(labels, categories=list(known) + others, ordered=True)
+
+
+def apply_schema(df):
+    # Compact and typed columns of the merged table
+    types = {}
+    if "Rank" in df.columns:
+        types["Rank"] = to_ordered_category(df["Rank"], CORE_RANKS)
+    if "GGS Class" in df.columns:
+        types["GGS Class"] = to_ordered_category(df["GGS Class"], GGS_CLASSES)
+    for c in ["Acronym", "Source"]:
+        if c in df.columns:
+            types[c] = df[c].astype("category")
+    return df.assign(**types)
+
+
+def get_acceptance_rates(acronyms):
+    return acronyms.astype("string").str.strip().str.upper().map(ACCEPTANCE_RATE).astype("float64")
+
+
+def get_rank_scores(ranks):
+    # One score per category (not per row), then indexed by the category codes
+    ranks = ranks if isinstance(ranks.dtype, pd.CategoricalDtype) else ranks.astype("category")
+    scores = np.array([RANK_SCORES.get(str(c).strip().upper(), 0) for c in ranks.cat.categories] + [0], dtype=np.int64)
+    return scores[ranks.cat.codes.to_numpy()]  # Code -1 (missing) => last score (0)
+
+
+def get_max_rank(*ranks):
+    return np.maximum.reduce([get_rank_scores(r) for r in ranks])
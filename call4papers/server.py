@@ -0,0 +1,205 @@
+import json
+import argparse
+import datetime
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from call4papers.constants import DEFAULT_SETUPS, SOURCE_MAX_AGE, CORE_EDITIONS
+from call4papers.index import ConferenceIndex
+from call4papers.dates import filter_in_time
+from call4papers.schema import get_acceptance_rates
+from call4papers.filters import filter_conferences, get_filter_columns
+from call4papers.main import prettify_csv
+from call4papers.sinks import format_dates
+
+FILTER_PARAMS = ["keywords", "nokeywords", "whitelist", "blacklist", "ratings", "trends"]
+
+
+class Snapshot:
+    # Merged and enriched table (one row per event year), ready to be filtered
+
+    def __init__(self, index):
+        self.index = index
+        self.created = datetime.datetime.now()
+
+        df = index.join(index.df, verbose=False)
+        self.df = df.assign(**{"Acceptance Rate": get_acceptance_rates(df["Acronym"])})
+        self.columns = get_filter_columns(self.df)
+
+    def query(self, keywords=None, nokeywords=None, whitelist=None, blacklist=None, ratings=None, trends=None,
+              in_time=False):
+        df = filter_conferences(self.df, keywords=keywords, nokeywords=nokeywords, whitelist=whitelist,
+                                blacklist=blacklist, ratings=ratings, trends=trends, columns=self.columns)
+
+        # Show only conferences where the deadline has not passed
+        if in_time:
+            df = filter_in_time(df)
+        return df
+
+    def status(self):
+        return {"created": self.created.isoformat(), "conferences": len(self.index),
+                "rows": len(self.df), "wikicfp_acronyms": len(self.index.events)}
+
+
+class SnapshotServer:
+    # Serves queries from the current snapshot, while a new one is built in the background
+
+    def __init__(self, index_args, refresh_interval=None):
+        self.index_args = index_args
+        self.refresh_interval = refresh_interval  # Seconds
+        self.snapshot = None
+        self.refreshing = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def build(self):
+        index = ConferenceIndex(**self.index_args)
+        if not index.ignore_wikicfp:
+            index.enrich(index.df["Acronym"])
+        return Snapshot(index)
+
+    def refresh(self):
+        with self._lock:
+            if self.refreshing:
+                return False
+            self.refreshing = True
+
+        try:
+            snapshot = self.build()
+            self.snapshot = snapshot  # Atomic swap: running queries keep the previous snapshot
+            print(f"Snapshot loaded! ({len(snapshot.df)} rows)")
+        except Exception as e:  # Keep serving the previous snapshot
+            print(f"\t=>[ERROR]: The snapshot could not be refreshed ({e})")
+        finally:
+            with self._lock:
+                self.refreshing = False
+        return True
+
+    def refresh_in_background(self):
+        thread = threading.Thread(target=self.refresh, daemon=True)
+        thread.start()
+        return thread
+
+    def refresh_periodically(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def query(self, params):
+        # Same semantics as the CLI: a setup provides the defaults, and explicit parameters override them
+        setup = params.get("setup")
+        if setup and setup not in DEFAULT_SETUPS:
+            raise ValueError(f"Unknown setup '{setup}'. Choices: {', '.join(DEFAULT_SETUPS.keys())}")
+
+        filters = {}
+        for name in FILTER_PARAMS:
+            if name in params:
+                filters[name] = set(x for x in params[name].split(",") if x)
+            else:
+                filters[name] = DEFAULT_SETUPS[setup].get(name, {}) if setup else {}
+
+        in_time = params.get("in_time", "0").lower() in {"1", "true", "yes"}
+        show_extra = params.get("show_extra", "0").lower() in {"1", "true", "yes"}
+        df = self.snapshot.query(in_time=in_time, **filters)
+        return prettify_csv(df, show_extra)
+
+    def status(self):
+        status = self.snapshot.status() if self.snapshot is not None else {}
+        status["refreshing"] = self.refreshing
+        return status
+
+    def serve(self, host="127.0.0.1", port=8000):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, format, *args):
+                pass
+
+            def send(self, status, body, content_type="application/json"):
+                body = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                params = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query, keep_blank_values=True).items()}
+
+                if url.path == "/status":
+                    self.send(200, json.dumps(server.status()))
+                elif url.path == "/query":
+                    if server.snapshot is None:
+                        self.send(503, json.dumps({"error": "The snapshot is not ready yet"}))
+                        return
+                    try:
+                        df = server.query(params)
+                    except ValueError as e:
+                        self.send(400, json.dumps({"error": str(e)}))
+                        return
+
+                    if params.get("format", "json") == "csv":
+                        self.send(200, df.to_csv(index=False), content_type="text/csv")
+                    else:
+                        self.send(200, format_dates(df).to_json(orient="records"))  # "YYYY-MM-DD" (as JSONL)
+                else:
+                    self.send(404, json.dumps({"error": "Not found"}))
+
+            def do_POST(self):
+                if urllib.parse.urlparse(self.path).path == "/refresh":
+                    started = not server.refreshing
+                    if started:
+                        server.refresh_in_background()
+                    self.send(202, json.dumps({"refreshing": True, "started": started}))
+                else:
+                    self.send(404, json.dumps({"error": "Not found"}))
+
+        # Load the first snapshot in the background (queries get a 503 until it is ready)
+        self.refresh_in_background()
+        if self.refresh_interval:
+            threading.Thread(target=self.refresh_periodically, daemon=True).start()
+
+        httpd = ThreadingHTTPServer((host, port), Handler)
+        httpd.daemon_threads = True
+        print(f"Serving on http://{host}:{port} (endpoints: /query, /status, POST /refresh)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="call4papers serve", description='Serve conference queries over HTTP')
+    parser.add_argument('--host', type=str, default="127.0.0.1", help='Host')
+    parser.add_argument('--port', type=int, default=8000, help='Port')
+    parser.add_argument('--refresh-interval', type=float, default=24, help='Hours between background refreshes (0 to disable)')
+    parser.add_argument('--ref-source', type=str, default="all", choices=["core", "ggs", "all"], help='Reference source for the LEFT JOIN (all=outer join)')
+    parser.add_argument('--force-download', action='store_true', help='Force download, ignoring cache files.')
+    parser.add_argument('--concurrency', type=int, default=16, help='Maximum number of concurrent WikiCFP requests')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Timeout (in seconds) for each WikiCFP request')
+    parser.add_argument('--retries', type=int, default=3, help='Number of retries (with backoff) for each WikiCFP request')
+    parser.add_argument('--cache-ttl', type=float, default=24, help='Time-to-live (in hours) of the cached WikiCFP responses')
+    parser.add_argument('--source-max-age', type=float, default=SOURCE_MAX_AGE / 3600, help='Hours before the cached CORE and GGS files are revalidated (conditional requests)')
+    parser.add_argument('--no-aliases', action='store_true', help='Join CORE and GGS on exact acronyms only (no fuzzy matches)')
+    parser.add_argument('--core-history', action='store_true', help='Add the CORE rank history, so queries can filter by trend (past editions are downloaded once and stored)')
+    parser.add_argument('--core-editions', type=str, default=None, help=f'Past CORE editions of the history. Comma-separated. (implies --core-history; default: {",".join(CORE_EDITIONS)})')
+    args = parser.parse_args(argv)
+
+    # CORE rank history
+    core_editions = None
+    if args.core_editions:
+        core_editions = [e.strip().upper() for e in args.core_editions.split(",") if e.strip()]
+    elif args.core_history:
+        core_editions = CORE_EDITIONS
+
+    index_args = {"force_download": args.force_download, "ref_source": args.ref_source,
+                  "concurrency": args.concurrency, "timeout": args.timeout, "retries": args.retries,
+                  "cache_ttl": args.cache_ttl*3600, "aliases": not args.no_aliases,
+                  "source_max_age": args.source_max_age*3600, "core_editions": core_editions}
+    server = SnapshotServer(index_args, refresh_interval=args.refresh_interval*3600 or None)
+    server.serve(host=args.host, port=args.port)
@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import datetime
+
+# Output format per file extension
+OUTPUT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".jsonl": "jsonl", ".sqlite": "sqlite", ".db": "sqlite"}
+SQLITE_TABLE = "conferences"
+SQLITE_KEY = ["Acronym", "Event year"]  # One row per conference and event year
+SQLITE_TYPES = {"Event year": "INTEGER"}  # Also when it is missing (no WikiCFP information)
+
+
+def get_output_format(output_file, output_format=None):
+    if output_format:
+        if output_format not in set(OUTPUT_FORMATS.values()):
+            raise ValueError(f"Unknown output format '{output_format}'. Choices: {', '.join(sorted(set(OUTPUT_FORMATS.values())))}")
+        return output_format
+
+    ext = os.path.splitext(output_file)[1].lower()
+    if ext not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format for '{output_file}'. Use one of these extensions "
+                         f"({', '.join(OUTPUT_FORMATS.keys())}) or '--format'")
+    return OUTPUT_FORMATS[ext]
+
+
+def format_dates(df):
+    # Dates as "YYYY-MM-DD" (JSON and SQLite have no date type)
+    from pandas.api.types import is_datetime64_any_dtype  # Deferred: the format check runs before pandas is needed
+    dates = {c: df[c].dt.strftime("%Y-%m-%d") for c in df.columns if is_datetime64_any_dtype(df[c])}
+    return df.assign(**dates)
+
+
+def save_csv(df, output_file):
+    df.to_csv(output_file, index=False)
+
+
+def save_parquet(df, output_file):
+    # Typed columns (categoricals, dates, nullable integers) are kept as they are. Requires pyarrow
+    df.to_parquet(output_file, index=False)
+
+
+def save_jsonl(df, output_file, chunksize=1000):
+    # Stream the rows in chunks instead of building the whole document in memory
+    df = df.reset_index(drop=True)
+    with open(output_file, 'w', encoding="utf-8") as f:
+        for i in range(0, len(df), chunksize):
+            chunk = format_dates(df.iloc[i:i+chunksize])
+            f.write(chunk.to_json(orient="records", lines=True, force_ascii=False))  # One line per row
+
+
+def get_sqlite_type(series):
+    from pandas.api.types import is_bool_dtype, is_integer_dtype, is_float_dtype
+    if series.name in SQLITE_TYPES:
+        return SQLITE_TYPES[series.name]
+    elif is_bool_dtype(series):
+        return "INTEGER"
+    elif is_integer_dtype(series):
+        return "INTEGER"
+    elif is_float_dtype(series):
+        return "REAL"
+    return "TEXT"
+
+
+def save_sqlite(df, output_file):
+    # Upsert: the rows of previous runs are kept, and the rows of this run replace them (same acronym and event year)
+    df = df.assign(**{c: None for c in SQLITE_KEY if c not in df.columns})
+    df = format_dates(df)
+    df = df.assign(updated=datetime.datetime.now().isoformat(timespec="seconds"))
+    columns = list(df.columns)
+
+    conn = sqlite3.connect(output_file)
+    try:
+        with conn:
+            # Create table (and add the columns of this run)
+            definitions = ", ".join(f'"{c}" {get_sqlite_type(df[c])}' for c in columns)
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {SQLITE_TABLE} ({definitions})')
+            existing = {row[1] for row in conn.execute(f'PRAGMA table_info({SQLITE_TABLE})')}
+            for c in columns:
+                if c not in existing:
+                    conn.execute(f'ALTER TABLE {SQLITE_TABLE} ADD COLUMN "{c}" {get_sqlite_type(df[c])}')
+
+            # Missing event years (no WikiCFP match) are part of the key too
+            key = ", ".join(f'ifnull("{c}", \'\')' for c in SQLITE_KEY)
+            conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS {SQLITE_TABLE}_key ON {SQLITE_TABLE} ({key})')
+
+            names = ", ".join(f'"{c}"' for c in columns)
+            updates = ", ".join(f'"{c}"=excluded."{c}"' for c in columns if c not in SQLITE_KEY)
+            query = f'INSERT INTO {SQLITE_TABLE} ({names}) VALUES ({", ".join("?" * len(columns))}) ' \
+                    f'ON CONFLICT({key}) DO UPDATE SET {updates}'
+            rows = df.astype(object).where(df.notnull(), None).itertuples(index=False, name=None)
+            conn.executemany(query, rows)
+    finally:
+        conn.close()
+
+
+SINKS = {"csv": save_csv, "parquet": save_parquet, "jsonl": save_jsonl, "sqlite": save_sqlite}
+
+
+def save_output(df, output_file, output_format=None):
+    SINKS[get_output_format(output_file, output_format)](df, output_file)
@@ -0,0 +1,261 @@
+import os
+import time
+import hashlib
+import threading
+import urllib.parse
+
+import requests
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from call4papers.constants import USER_AGENT, CORE_URL, GGS_URL, SOURCE_TIMEOUT
+from call4papers.profiling import stage, timed, count
+from call4papers.cache import load_snapshot, save_snapshot, get_cache_dir, get_core_filename, get_ggs_filename, \
+    load_validators, save_validators, is_fresh, file_hash
+from call4papers.resolution import apply_aliases
+
+
+# Sources being revalidated in the background (one thread per file)
+REFRESHING = set()
+REFRESHING_LOCK = threading.Lock()
+CORE_HEADER = "Index,Title,Acronym,Source,Rank,DBLP,hasData?,Primary FoR,Comments,Average Rating\n"
+
+
+def conditional_get(url, validators=None, headers=None, name="source", timeout=SOURCE_TIMEOUT):
+    # GET with the validators of the previous download of this url. None if it has not been modified (304)
+    validators = validators if validators and validators.get("url") == url else {}
+    headers = dict(headers or {})
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = requests.get(url, headers=headers, allow_redirects=True, timeout=timeout)
+    count("http_requests")
+    count("http_bytes", len(response.content))
+    if response.status_code == 304:
+        count("source_not_modified")
+        return None
+    if response.status_code != 200:
+        raise ConnectionError(f"Invalid request for {name}")
+    return response
+
+
+def get_response_validators(url, response, **kwargs):
+    return dict(url=url, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"),
+                **kwargs)
+
+
+def save_source(savepath, content, validators):
+    # Write the file only if its content changed (so its snapshot stays valid). Returns the new validators
+    sha256 = hashlib.sha256(content).hexdigest()
+    if sha256 == validators.get("sha256") and os.path.exists(savepath):
+        count("source_unchanged")
+        return sha256
+
+    # Write atomically (a background refresh can replace a file that is being read)
+    tmp_path = savepath + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, savepath)
+    print(f"File saved! ({savepath})")
+    return sha256
+
+
+def get_core_url(core_code, base_url=CORE_URL):
+    # CSV export of one edition (e.g. CORE2021)
+    return f"{base_url}?search=&by=all&source={core_code}&sort=atitle&page=1&do=Export"
+
+
+@timed("load.core.scrape")
+def scrape_core_conferences(savepath, core_code, base_url=CORE_URL, validators=None):
+    url = get_core_url(core_code, base_url)
+    validators = validators or {}
+
+    # Download file (unless not modified)
+    response = conditional_get(url, validators, name="CORE")
+    if response is None:
+        print("CORE not modified!")
+        return validators
+
+    # Save csv
+    content = (CORE_HEADER + response.text).encode("utf-8")
+    sha256 = save_source(savepath, content, validators)
+    return get_response_validators(url, response, sha256=sha256)
+
+
+@timed("load.ggs.scrape")
+def scrape_ggs_conferences(savepath, ggs_url=GGS_URL, validators=None):
+    validators = validators or {}
+    headers = {"User-Agent": USER_AGENT}
+
+    # Get index (the link to the XLXS file is kept for the next revalidation)
+    print(f"Checking conferences from '{ggs_url}'...")
+    index = validators.get("index") or {}
+    response = conditional_get(ggs_url, index if index.get("href") else None, headers=headers, name="GGS")
+    if response is not None:
+        soup = BeautifulSoup(response.text, 'lxml')
+        xlxs_href = soup.select_one("#text > div.entry > table:nth-child(1) > tbody > tr > td:nth-child(2) > a[href]").attrs["href"]
+        index = get_response_validators(ggs_url, response, href=urllib.parse.urljoin(ggs_url, xlxs_href))
+
+    # Download file (unless not modified)
+    response = conditional_get(index["href"], validators, name="GGS")
+    if response is None:
+        print("GGS not modified!")
+        return dict(validators, index=index)
+
+    # Save xlsx
+    sha256 = save_source(savepath, response.content, validators)
+    return get_response_validators(index["href"], response, sha256=sha256, index=index)
+
+
+def update_source(filename, scrape, force_download=False, max_age=None, background=False, name="source"):
+    # Download the file if it is missing (or forced), and revalidate it when it is older than max_age (seconds)
+    validators = load_validators(filename)
+    exists = os.path.exists(filename)
+    if exists and not force_download and is_fresh(filename, validators, max_age):
+        return
+
+    # Stale file: this run uses it, and the next one gets the new version
+    if exists and not force_download and background:
+        with REFRESHING_LOCK:
+            if filename in REFRESHING:
+                return
+            REFRESHING.add(filename)
+        print(f"Refreshing {name} in the background...")
+        threading.Thread(target=revalidate_source, args=(filename, scrape, validators, name), daemon=False).start()
+        return
+
+    if not exists:
+        print(f"No cached file. The {name} download is about to start...")
+    # Forced: unconditional requests (the hash still tells whether the file changed)
+    if force_download:
+        validators = {"sha256": validators.get("sha256")}
+    revalidate_source(filename, scrape, validators, name, raise_errors=not exists)
+
+
+def revalidate_source(filename, scrape, validators, name="source", raise_errors=False):
+    try:
+        validators = scrape(validators)
+        validators["checked_at"] = time.time()
+        save_validators(filename, validators)
+    except (ConnectionError, requests.RequestException) as e:
+        if raise_errors:
+            raise
+        print(f"\t=>[ERROR]: {name} could not be revalidated. Using the cached file ({e})")
+    finally:
+        with REFRESHING_LOCK:
+            REFRESHING.discard(filename)
+
+
+def get_core_conferences(filename):
+    print(f"Loading from cache... ({os.path.abspath(filename)})")
+    with stage("load.core.read_csv"):
+        df = pd.read_csv(filename)
+    print(f"File CORE loaded! ({len(df)} rows)")
+
+    # Remove index and last two rows
+    df = df.drop(df.columns[[0, 7, 8, 9]], axis=1)
+    return df
+
+
+def get_ggs_conferences(filename):
+    print(f"Loading GGS from cache... ({os.path.abspath(filename)})")
+    with stage("load.ggs.read_excel"):
+        df = pd.read_excel(filename, header=[1])
+    print(f"File loaded! ({len(df)} rows)")
+    return df
+
+
+def normalize_core_conferences(df):
+    df = df.rename(columns={"Title": "CORE_title", "Acronym": "Acronym"})
+
+    # Normalize values
+    df["CORE_title"] = df["CORE_title"].apply(lambda x: str(x).strip())
+    df["Acronym"] = df["Acronym"].apply(lambda x: str(x).strip().upper())  # Force uppercase
+    return df
+
+
+def normalize_ggs_conferences(df):
+    # Rename columns and remove index column
+    df = df.rename(columns={"Title": "GGS_title", "Acronym": "Acronym"})
+    df = df.drop(df.columns[[0]], axis=1)
+
+    # Normalize values
+    df["GGS_title"] = df["GGS_title"].apply(lambda x: str(x).strip())
+    df["Acronym"] = df["Acronym"].apply(lambda x: str(x).strip().upper())  # Force uppercase
+    return df
+
+
+@timed("load.core")
+def load_core_conferences(force_download, cache_dir=".", base_url=CORE_URL, max_age=None, background=False):
+    filename, core_code = get_core_filename(cache_dir)
+
+    # Download or revalidate the raw file
+    update_source(filename, lambda validators: scrape_core_conferences(filename, core_code, base_url, validators),
+                  force_download=force_download, max_age=max_age, background=background, name="CORE")
+
+    # Load normalized snapshot (invalidated when the raw file changes)
+    source_hash = file_hash(filename)  # Before parsing: a background refresh can replace the file meanwhile
+    df = load_snapshot(filename, source_hash)
+    if df is not None:
+        print(f"CORE loaded from snapshot! ({len(df)} rows)")
+        return df
+
+    # Parse raw file
+    df = normalize_core_conferences(get_core_conferences(filename))
+    save_snapshot(filename, df, source_hash)
+    return df
+
+
+@timed("load.ggs")
+def load_ggs_conferences(force_download, cache_dir=".", base_url=GGS_URL, max_age=None, background=False):
+    filename = get_ggs_filename(cache_dir)
+
+    # Download or revalidate the raw file
+    update_source(filename, lambda validators: scrape_ggs_conferences(filename, base_url, validators),
+                  force_download=force_download, max_age=max_age, background=background, name="GGS")
+
+    # Load normalized snapshot (invalidated when the raw file changes)
+    source_hash = file_hash(filename)  # Before parsing: a background refresh can replace the file meanwhile
+    df = load_snapshot(filename, source_hash)
+    if df is not None:
+        print(f"GGS loaded from snapshot! ({len(df)} rows)")
+        return df
+
+    # Parse raw file
+    df = normalize_ggs_conferences(get_ggs_conferences(filename))
+    save_snapshot(filename, df, source_hash)
+    return df
+
+
+def filter_invalid_rows(df):
+    # Remove specific values
+    df = df[df["Title"].apply(lambda x: isinstance(x, str) and len(x) >= 2)]
+    df = df[df["Acronym"].apply(lambda x: isinstance(x, str) and len(x) >= 2)]
+    return df
+
+
+def normalize_title(title1, title2):
+    # Normalize titles
+    title1 = title1.strip() if isinstance(title1, str) and title1.strip() not in {"", "nan", "-"} else None
+    title2 = title2.strip() if isinstance(title2, str) and title2.strip() not in {"", "nan", "-"} else None
+
+    # Select title (title1 has preference, CORE)
+    title_normalized = title2 if not title1 and title2 else title1
+    return title_normalized
+
+
+@timed("merge")
+def merge_conferences(df_core, df_ggs, ref_source="all", aliases=None):
+    # Same venue, different acronyms (e.g. NIPS and NEURIPS)
+    if aliases is not None:
+        df_core, df_ggs = apply_aliases(df_core, df_ggs, aliases, ref_source=ref_source)
+
+    # Perform merge operation (JOIN)
+    how = {"core": "left", "ggs": "right", "all": "outer"}
+    df = pd.merge(df_core, df_ggs, on='Acronym', how=how.get(ref_source, "outer"))
+
+    # Create reference title
+    df["Title"] = df[['CORE_title', 'GGS_title']].apply(lambda x: normalize_title(*x), axis=1)
+    return df
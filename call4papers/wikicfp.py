@@ -0,0 +1,357 @@
+import time
+import datetime
+import re
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+
+import requests
+import lxml.html
+from requests.adapters import HTTPAdapter
+import pandas as pd
+from tqdm import tqdm
+
+from call4papers.constants import WIKICFP_URL, WIKICFP_CATEGORY_URL, USER_AGENT
+from call4papers.matching import match_candidates, MATCH_THRESHOLD
+from call4papers.profiling import timed, count
+
+WHITESPACE = re.compile(r"[\s\xa0]+")
+EVENT_NAME = re.compile(r"^(.*\S)\s+(\d{4})$")  # "ICML 2022" => (ICML, 2022)
+PAGE_LINK = re.compile(r"[?&]page=(\d+)")
+JOIN_KEYS = ["Title", "Acronym"]  # Lookup key of the conferences (the rest of the row is not needed)
+DEADLINE_COLUMNS = ["Event year", "when", "where", "deadline"]
+
+
+class SingleFlight:
+    # One lookup in flight per key: concurrent callers (batch setups, index queries, server refreshes) wait for the
+    # result of the first one instead of sending the same request again
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            count("wikicfp_lookups_coalesced")
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+WIKICFP_FLIGHTS = SingleFlight()
+
+
+def create_session(concurrency=16):
+    # Keep-alive pool with one connection per worker
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(concurrency, 1))
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def fetch_wikicfp(session, acronym, year='f', timeout=10.0, retries=3, backoff=0.5, base_url=WIKICFP_URL):
+    # year: all='a', 2021='t', 2021+='f', 2022='n'
+    url = f"{base_url}?q={urllib.parse.quote(acronym)}&year={year}"
+    return fetch_url(session, url, name=acronym, timeout=timeout, retries=retries, backoff=backoff)
+
+
+def fetch_url(session, url, name=None, timeout=10.0, retries=3, backoff=0.5):
+    error = None
+    for attempt in range(retries + 1):
+        if attempt > 0:  # Exponential backoff
+            time.sleep(backoff * 2 ** (attempt - 1))
+
+        try:
+            count("http_requests")
+            response = session.get(url, timeout=timeout)
+        except (requests.Timeout, requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:  # Transient
+            count("http_errors")
+            error = e
+            continue
+        except requests.RequestException as e:  # E.g. too many redirects: raised as the ConnectionError below
+            count("http_errors")
+            error = e
+            break
+        count("http_bytes", len(response.content))
+
+        if response.status_code == 200:
+            return response.text
+        elif response.status_code == 429 or response.status_code >= 500:  # Retry only transient errors
+            error = f"status code {response.status_code}"
+        else:
+            error = f"status code {response.status_code}"
+            break
+
+    raise ConnectionError(f"Invalid request for WikiCFP: {name or url} ({error})")
+
+
+def normalize_acronym(acronym):
+    # Fix acronym (lookup key): "MT SUMMIT" and "MTSUMMIT" are the same query
+    return WHITESPACE.sub('', acronym)
+
+
+def get_lookup_key(acronym, year='f', base_url=WIKICFP_URL):
+    return normalize_acronym(acronym), year, base_url
+
+
+@timed("enrich.parse")
+def parse_events(html):
+    # Read only the results table: header row (Event, When, Where, Deadline) followed by two rows per event
+    # (event, title) and (when, where, deadline)
+    events = []
+    if not html or not html.strip():
+        return events
+
+    tree = lxml.html.fromstring(html)
+    header = tree.xpath("//tr[count(td)=4 and normalize-space(td[1])='Event' and normalize-space(td[2])='When' "
+                        "and normalize-space(td[3])='Where' and normalize-space(td[4])='Deadline']")
+    if not header:
+        return events
+
+    event = None
+    for tr in header[0].itersiblings("tr"):
+        cells = [WHITESPACE.sub(" ", td.text_content()).strip() for td in tr.xpath("./td")]
+        if len(cells) == 2:  # (event, title)
+            event = {"event": cells[0], "title": cells[1]}
+        elif len(cells) == 3 and event is not None:  # (when, where, deadline)
+            event.update({"when": cells[0], "where": cells[1], "deadline": cells[2]})
+            events.append(event)
+            event = None
+    return events
+
+
+def get_candidates(key, title, acronym, events, years):
+    # Events with the exact acronym (this year and next)
+    acronym = normalize_acronym(acronym)
+    candidates = []
+    for yr in years:
+        for j, e in enumerate(events):
+            if e["event"] == f"{acronym} {yr}":
+                candidates.append({"key": key, "year": yr, "event": j, "query": str(title), "choice": str(e["title"])})
+    return candidates
+
+
+def build_deadlines(event, yr):
+    # Raw values: the dates are parsed at once for the whole table (see normalize_deadlines)
+    values = {"Event year": int(yr),
+              "when": event["when"],
+              "where": event["where"],
+              "deadline": event["deadline"],
+              }
+    return values
+
+
+def resolve_deadlines(conferences, events, threshold=MATCH_THRESHOLD, verbose=True):
+    # conferences: list of (title, acronym); events: list of parsed WikiCFP events per conference
+    year = int(datetime.datetime.now().year)
+    years = [year, year+1]
+
+    # Score all the candidates at once
+    candidates = [c for i, (title, acronym) in enumerate(conferences) for c in get_candidates(i, title, acronym, events[i], years)]
+    candidates = pd.DataFrame(candidates, columns=["key", "year", "event", "query", "choice"])
+    best = match_candidates(candidates, threshold=threshold)
+    best = {(k, yr): j for k, yr, j in zip(best["key"], best["year"], best["event"])}
+
+    results = []
+    for i, (title, acronym) in enumerate(conferences):
+        values = []
+        for yr in years:
+            if (i, yr) in best:
+                values.append(build_deadlines(events[i][best[(i, yr)]], yr))
+            elif verbose:
+                print(f'No exact match has been found: {normalize_acronym(acronym)} {yr} | {title}')
+        results.append(values)
+    return results
+
+
+def get_events(acronym, year='f', session=None, timeout=10.0, retries=3, backoff=0.5, base_url=WIKICFP_URL, cache=None,
+               refresh=False):
+    # Identical queries in flight are sent (and parsed) once
+    return WIKICFP_FLIGHTS.do(get_lookup_key(acronym, year, base_url), _get_events, acronym, year=year, session=session,
+                              timeout=timeout, retries=retries, backoff=backoff, base_url=base_url, cache=cache,
+                              refresh=refresh)
+
+
+def _get_events(acronym, year='f', session=None, timeout=10.0, retries=3, backoff=0.5, base_url=WIKICFP_URL, cache=None,
+                refresh=False):
+    acronym_key = normalize_acronym(acronym)
+
+    # Check cache
+    html = cache.get(acronym_key, year) if cache is not None and not refresh else None
+    if html is None:
+        session = session if session is not None else create_session(concurrency=1)
+        html = fetch_wikicfp(session, acronym_key, year=year, timeout=timeout, retries=retries,
+                             backoff=backoff, base_url=base_url)
+        if cache is not None:
+            cache.set(acronym_key, year, html)
+    return parse_events(html)
+
+
+def get_category_url(category, page=1, base_url=WIKICFP_CATEGORY_URL):
+    return f"{base_url}?conference={urllib.parse.quote(category)}&page={page}"
+
+
+def get_category_page(category, page=1, session=None, timeout=10.0, retries=3, backoff=0.5,
+                      base_url=WIKICFP_CATEGORY_URL, cache=None, refresh=False):
+    # Listing pages share the WikiCFP cache, keyed by ("@<category>", "p<page>")
+    key, year = f"@{category}", f"p{page}"
+    html = cache.get(key, year) if cache is not None and not refresh else None
+    if html is None:
+        session = session if session is not None else create_session(concurrency=1)
+        html = WIKICFP_FLIGHTS.do((key, year, base_url), fetch_url, session, get_category_url(category, page, base_url),
+                                  name=f"{category} (page {page})", timeout=timeout, retries=retries, backoff=backoff)
+        if cache is not None:
+            cache.set(key, year, html)
+    return html
+
+
+def parse_last_page(html):
+    # Highest page number linked from the pagination (1 if there is none)
+    tree = lxml.html.fromstring(html) if html and html.strip() else None
+    hrefs = tree.xpath("//a/@href") if tree is not None else []
+    return max([int(m.group(1)) for m in map(PAGE_LINK.search, hrefs) if m] + [1])
+
+
+def index_events(events, index=None):
+    # Events per (normalized) acronym, in the same format as the search results
+    index = {} if index is None else index
+    for e in events:
+        match = EVENT_NAME.match(e["event"])
+        if match:
+            index.setdefault(normalize_acronym(match.group(1)), []).append(e)
+    return index
+
+
+def get_deadline_records(keys, events, threshold=MATCH_THRESHOLD, verbose=True):
+    # keys: unique (title, acronym) rows. One record per key and matched event year (raw values)
+    conferences = list(zip(keys["Title"], keys["Acronym"]))
+    results = resolve_deadlines(conferences, [events.get(normalize_acronym(a), []) for _, a in conferences],
+                                threshold=threshold, verbose=verbose)
+
+    positions = [i for i, values in enumerate(results) for _ in values]
+    values = pd.DataFrame([v for r in results for v in r], columns=DEADLINE_COLUMNS)
+    return pd.concat([keys.iloc[positions].reset_index(drop=True), values], axis=1)
+
+
+@timed("enrich.fetch")
+def fetch_events(acronyms, known=None, concurrency=16, timeout=10.0, retries=3, backoff=0.5, base_url=WIKICFP_URL,
+                 cache=None, refresh=False, checkpoint=None):
+    # Returns the parsed WikiCFP events per (normalized) acronym
+    events = dict(known) if known else {}
+
+    # Reuse the lookups completed by a previous (interrupted) run
+    if checkpoint is not None and checkpoint.done:
+        print(f"Resuming... ({len(checkpoint.done)} lookups loaded from checkpoint)")
+        events.update(checkpoint.done)
+
+    # One lookup per normalized acronym, whatever the number of rows that need it
+    pending, duplicates = {}, 0
+    for acronym in acronyms:
+        key = normalize_acronym(acronym)
+        if key in pending:
+            duplicates += 1
+        elif key not in events:
+            pending[key] = None
+    count("wikicfp_lookups", len(pending))
+    count("wikicfp_lookups_deduplicated", duplicates)
+
+    # The lookups are I/O-bound: threads sharing a keep-alive session beat a process pool
+    session = create_session(concurrency=concurrency)
+    executor = ThreadPoolExecutor(max_workers=max(concurrency, 1))
+    futures = {executor.submit(get_events, acronym=key, session=session, timeout=timeout, retries=retries,
+                               backoff=backoff, base_url=base_url, cache=cache, refresh=refresh): key for key in pending}
+    try:
+        # Track completions (not dispatches) and stream them to the checkpoint
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            key = futures[future]
+            try:
+                events[key] = future.result()
+            except ConnectionError as e:
+                print(f"\t=>[ERROR]: {e}")
+                continue
+
+            if checkpoint is not None:
+                checkpoint.append(key, events[key])
+    except KeyboardInterrupt:
+        for future in futures:
+            future.cancel()
+        if checkpoint is not None:
+            print(f"Interrupted! Use '--resume' to continue from the checkpoint ({checkpoint.path})")
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        session.close()
+
+    if duplicates:
+        print(f"WikiCFP lookups: {len(pending)} unique ({duplicates} duplicate rows reused the same lookup)")
+    if cache is not None:
+        print(f"WikiCFP cache: {cache.hits} hits, {cache.misses} misses")
+    return events
+
+
+@timed("enrich.crawl")
+def crawl_categories(categories, concurrency=16, max_pages=20, timeout=10.0, retries=3, backoff=0.5,
+                     base_url=WIKICFP_CATEGORY_URL, cache=None, refresh=False):
+    # Bulk mode: a few listing pages cover hundreds of conferences (events per acronym)
+    session = create_session(concurrency=concurrency)
+    executor = ThreadPoolExecutor(max_workers=max(concurrency, 1))
+    kwargs = dict(session=session, timeout=timeout, retries=retries, backoff=backoff, base_url=base_url, cache=cache,
+                  refresh=refresh)
+
+    pages = {}
+
+    def fetch_all(jobs):
+        futures = {executor.submit(get_category_page, category, page, **kwargs): (category, page)
+                   for category, page in jobs}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            try:
+                pages[futures[future]] = future.result()
+            except ConnectionError as e:
+                print(f"\t=>[ERROR]: {e}")
+
+    try:
+        # The first page of each category gives its number of pages. Then, the rest are fetched at once
+        fetch_all([(category, 1) for category in dict.fromkeys(categories)])
+        fetch_all([(category, page) for (category, _), html in list(pages.items())
+                   for page in range(2, min(parse_last_page(html), max_pages) + 1)])
+    finally:
+        executor.shutdown(wait=True)
+        session.close()
+
+    # Same event in several categories => once
+    index, seen = {}, set()
+    for key in sorted(pages):
+        events = [e for e in parse_events(pages[key]) if (e["event"], e["title"]) not in seen]
+        seen.update((e["event"], e["title"]) for e in events)
+        index_events(events, index)
+
+    count("wikicfp_category_pages", len(pages))
+    print(f"WikiCFP categories: {len(pages)} pages, {len(seen)} events, {len(index)} acronyms")
+    return index
+
+
+@timed("enrich.join")
+def join_deadlines(df, events, verbose=True):
+    # Resolve each (title, acronym) once, then join the records back (row order kept; one row per event year)
+    keys = df[JOIN_KEYS].drop_duplicates()
+    records = get_deadline_records(keys, events, verbose=verbose)
+    return df.merge(records, on=JOIN_KEYS, how="left")
+